@@ -0,0 +1,259 @@
+from loops import match_counting_loop, solve
+from profiler import OPCODE_NAMES, READS, WRITES
+
+BRANCHES = (40, 41, 42)
+
+
+class Analysis:
+    def __init__(self, sim, entry=0):
+        self.size = sim.MAX_MEM
+        self.fmt4 = sim.format == 4
+        self.words = list(sim.memory)
+        self.entry = entry
+        self.base = sim._decode_base()
+        self.modulus = sim._max_word() + 1
+        self.digits = sim.format
+
+        self.decoded = {}
+        self.successors = {}
+        self.bad_opcodes = []
+        self.bad_operands = []
+        self.falls_off_end = []
+        self._walk()
+
+        self.data_reads = {self.decoded[a][1] for a in self.successors if self.decoded[a][0] in READS}
+        self.data_writes = {self.decoded[a][1] for a in self.successors if self.decoded[a][0] in WRITES}
+        self.self_modifying = sorted(self.data_writes & set(self.decoded))
+        self.jumps_to_data = sorted(
+            (a, t) for a in self.successors for t in self.successors[a]
+            if self.decoded[a][0] in BRANCHES and t == self.decoded[a][1]
+            and (t in self.data_reads or t in self.data_writes or t not in self.successors)
+        )
+        self.unreachable = [
+            a for a, w in enumerate(self.words)
+            if w != 0 and a not in self.decoded and a not in self.data_reads and a not in self.data_writes
+        ]
+        self.blocks = self._blocks()
+        self.infinite_loops = self._exitless_loops()
+        self.non_terminating = self._never_terminates()
+        self.worst_case = None if self.self_modifying else self._worst_case()
+
+    def _decode(self, address):
+        word = abs(int(self.words[address]))
+        return divmod(word, self.base)
+
+    def _walk(self):
+        pending = [self.entry]
+        while pending:
+            address = pending.pop()
+            if address in self.decoded:
+                continue
+            if not (0 <= address < self.size):
+                continue
+            opcode, operand = self._decode(address)
+            self.decoded[address] = (opcode, operand)
+            if not self.fmt4 and operand >= self.size:
+                self.bad_operands.append(address)
+                continue
+            if opcode not in OPCODE_NAMES:
+                self.bad_opcodes.append(address)
+                continue
+            if opcode == 40:
+                targets = [operand]
+            elif opcode in (41, 42):
+                targets = [operand, address + 1]
+            elif opcode == 43:
+                targets = []
+            else:
+                targets = [address + 1]
+            if address + 1 in targets and address + 1 >= self.size:
+                self.falls_off_end.append(address)
+                targets.remove(address + 1)
+            self.successors[address] = targets
+            pending.extend(targets)
+        self.bad_opcodes.sort()
+        self.bad_operands.sort()
+
+    def _blocks(self):
+        leaders = {self.entry}
+        for a, targets in self.successors.items():
+            if self.decoded[a][0] in BRANCHES or len(targets) != 1:
+                leaders.update(targets)
+                leaders.add(a + 1)
+        blocks = {}
+        for start in sorted(leaders & set(self.successors)):
+            end = start
+            while end in self.successors and (end == start or end not in leaders):
+                if self.decoded[end][0] in BRANCHES or self.decoded[end][0] == 43:
+                    end += 1
+                    break
+                end += 1
+            last = end - 1
+            blocks[start] = {"end": end, "successors": sorted(self.successors.get(last, [end]))}
+        return blocks
+
+    def _components(self):
+        # Tarjan's strongly connected components over the instruction graph.
+        index, low, stack, on_stack, components = {}, {}, [], set(), []
+        counter = [0]
+
+        def visit(root):
+            work = [(root, iter(self.successors.get(root, ())))]
+            index[root] = low[root] = counter[0]
+            counter[0] += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in self.successors:
+                        continue
+                    if child not in index:
+                        index[child] = low[child] = counter[0]
+                        counter[0] += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.successors.get(child, ()))))
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(sorted(component))
+
+        for address in sorted(self.successors):
+            if address not in index:
+                visit(address)
+        return components
+
+    def _exitless_loops(self):
+        loops = []
+        for component in self._components():
+            members = set(component)
+            cyclic = len(component) > 1 or component[0] in self.successors[component[0]]
+            if not cyclic:
+                continue
+            leaves = any(t not in members for a in component for t in self.successors[a])
+            halts = any(self.decoded[a][0] == 43 for a in component)
+            if not leaves and not halts and not (members & self.data_writes):
+                loops.append(component)
+        return loops
+
+    def _never_terminates(self):
+        # Every reachable instruction is one that can neither stop the machine
+        # nor raise: no HALT, no invalid word, no way off the end of memory, no
+        # DIVIDE or READ, and no write that could turn code into something else.
+        if self.bad_opcodes or self.bad_operands or self.falls_off_end or self.self_modifying:
+            return False
+        return not any(self.decoded[a][0] in (10, 32, 43) for a in self.successors)
+
+    def _loop_cost(self, head):
+        words = [self.decoded.get(a) for a in range(head, head + 5)]
+        if None in words:
+            return None
+        loop = match_counting_loop(words, head)
+        if loop is None:
+            return None
+        counter, step, sign, exit_opcode, target, test_first = loop
+        # The counter may only be written by the loop itself and the step not at all.
+        if self._writers(counter) != {head + (3 if test_first else 2)} or self._writers(step):
+            return None
+        x0, d = self.words[counter], sign * self.words[step]
+        if test_first and (x0 == 0 if exit_opcode == 42 else x0 < 0):
+            return None
+        found = solve(x0, d, exit_opcode, self.modulus)
+        if found is None:
+            return None
+        n = found[0]
+        return (5 * n + 2 if test_first else 5 * n - 1), target
+
+    def _writers(self, address):
+        return {a for a in self.successors if self.decoded[a][0] in WRITES and self.decoded[a][1] == address}
+
+    def _worst_case(self):
+        # Longest path (in executed instructions) from the entry to a HALT, with
+        # recognised counting loops collapsed to their exact iteration cost.
+        # None when any other cycle is reachable.
+        graph = {}
+        collapsed = set()
+        for head in sorted(self.successors):
+            if head in collapsed:
+                continue
+            cost = self._loop_cost(head)
+            if cost is not None:
+                inner = set(range(head + 1, head + 5))
+                entered = any(t in inner for a, ts in self.successors.items() if a not in inner and a != head for t in ts)
+                if not entered:
+                    graph[head] = (cost[0], [cost[1]])
+                    collapsed.update(inner)
+                    continue
+            graph[head] = (1, self.successors[head])
+        for address in collapsed:
+            graph.pop(address, None)
+
+        memo = {}
+        visiting = set()
+        pending = [(self.entry, False)]
+        while pending:
+            node, done = pending.pop()
+            if done:
+                visiting.discard(node)
+                cost, targets = graph[node]
+                memo[node] = cost + max((memo[t] for t in targets), default=0)
+                continue
+            if node in memo:
+                continue
+            if node in visiting or node not in graph:
+                return None
+            visiting.add(node)
+            pending.append((node, True))
+            for target in graph[node][1]:
+                if target not in memo:
+                    if target in visiting or target not in graph:
+                        return None
+                    pending.append((target, False))
+        return memo.get(self.entry)
+
+    @property
+    def errors(self):
+        found = []
+        for a in self.bad_opcodes:
+            found.append(f"{a:03d}: invalid opcode {self.decoded[a][0]}")
+        for a in self.bad_operands:
+            found.append(f"{a:03d}: operand {self.decoded[a][1]} out of range for {self.digits}-digit program")
+        for a in self.falls_off_end:
+            found.append(f"{a:03d}: execution can run past the end of memory")
+        if self.non_terminating:
+            found.append("program can never halt")
+        return found
+
+    def to_dict(self):
+        return {
+            "reachable": sorted(self.successors),
+            "blocks": {str(start): block for start, block in self.blocks.items()},
+            "unreachable": self.unreachable,
+            "jumps_to_data": [list(edge) for edge in self.jumps_to_data],
+            "bad_opcodes": self.bad_opcodes,
+            "bad_operands": self.bad_operands,
+            "falls_off_end": self.falls_off_end,
+            "self_modifying": self.self_modifying,
+            "infinite_loops": self.infinite_loops,
+            "non_terminating": self.non_terminating,
+            "worst_case": self.worst_case,
+            "errors": self.errors,
+        }
+
+
+def analyze(sim, entry=0):
+    return Analysis(sim, entry)
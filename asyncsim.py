@@ -0,0 +1,72 @@
+import asyncio
+import inspect
+from uvsim import UVSim
+
+_NOTHING = object()
+
+
+class _PendingRead(Exception):
+    pass
+
+
+class _PendingWrite(Exception):
+    def __init__(self, value):
+        super().__init__(value)
+        self.value = value
+
+
+class AsyncUVSim(UVSim):
+    # READ and WRITE abort the current run() slice with an exception, leaving
+    # the instruction pointer on the I/O instruction. arun() awaits the async
+    # callable and then resumes run(), which re-executes the instruction with
+    # the value (or acknowledgement) already in hand.
+    __slots__ = ("async_input", "async_output", "yield_every", "_ready", "_written")
+
+    def __init__(self, input_function=None, output_function=None, engine="interp", yield_every=1000):
+        super().__init__(self._pending_read, self._pending_write, engine)
+        self.async_input = input_function or self._default_async_input
+        self.async_output = output_function or self._default_async_output
+        self.yield_every = yield_every
+        self._ready = _NOTHING
+        self._written = False
+
+    async def _default_async_input(self):
+        return await asyncio.to_thread(self._default_input)
+
+    async def _default_async_output(self, value):
+        self._default_output(value)
+
+    def _pending_read(self):
+        if self._ready is _NOTHING:
+            raise _PendingRead()
+        value, self._ready = self._ready, _NOTHING
+        return value
+
+    def _pending_write(self, value):
+        if not self._written:
+            raise _PendingWrite(value)
+        self._written = False
+
+    async def arun(self, max_steps=None):
+        start = self.steps
+        while max_steps is None or self.steps - start < max_steps:
+            budget = self.yield_every if max_steps is None else min(self.yield_every, max_steps - (self.steps - start))
+            try:
+                self.run(max_steps=budget)
+            except _PendingRead:
+                value = self.async_input()
+                if inspect.isawaitable(value):
+                    value = await value
+                self._ready = value
+            except _PendingWrite as pending:
+                result = self.async_output(pending.value)
+                if inspect.isawaitable(result):
+                    await result
+                self._written = True
+            else:
+                if not self.running:
+                    break
+                await asyncio.sleep(0)
+            if not self.running:
+                break
+        return self.steps - start
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from uvsim import UVSim
+from analysis import analyze
+from binary import Archive, EXTENSION, load_file
+from cache import ResultCache, result_key, capture, DEFAULT_DISK_BYTES
+
+DEFAULT_MAX_STEPS = 10_000_000
+DEFAULT_TIMEOUT = 10.0
+SLICE = 10_000
+
+_worker_cache = None
+
+
+def _init_worker(cache_dir=None, cache_bytes=DEFAULT_DISK_BYTES):
+    global _worker_cache
+    _worker_cache = ResultCache(directory=cache_dir, max_bytes=cache_bytes)
+
+
+def memory_hash(memory):
+    return hashlib.sha256(array("i", memory).tobytes()).hexdigest()
+
+
+def read_program(path):
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def read_inputs(path):
+    with open(path, "r") as f:
+        return [int(line) for line in f if line.strip()]
+
+
+def load_job(sim, job):
+    if job["program"].endswith(EXTENSION):
+        load_file(sim, job["program"], job.get("name"))
+    else:
+        sim.load(read_program(job["program"]))
+
+
+def find_jobs(source):
+    if os.path.isdir(source):
+        jobs = []
+        for name in sorted(os.listdir(source)):
+            program = os.path.join(source, name)
+            if name.endswith(".txt"):
+                inputs = os.path.splitext(program)[0] + ".in"
+                jobs.append({"program": program, "inputs": inputs if os.path.exists(inputs) else []})
+            elif name.endswith(EXTENSION):
+                # One job per program in the archive, with inputs from <name>.in.
+                with Archive(program) as archive:
+                    members = list(archive)
+                for member in members:
+                    inputs = os.path.join(source, member + ".in")
+                    jobs.append({"program": program, "name": member,
+                                 "inputs": inputs if os.path.exists(inputs) else []})
+        return jobs
+
+    base = os.path.dirname(source)
+    jobs = []
+    with open(source, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            program = os.path.join(base, entry["program"])
+            inputs = entry.get("inputs", [])
+            if isinstance(inputs, str):
+                inputs = os.path.join(base, inputs)
+            job = {"program": program, "inputs": inputs}
+            if "name" in entry:
+                job["name"] = entry["name"]
+            jobs.append(job)
+    return jobs
+
+
+def run_limited(sim, max_steps, timeout, start):
+    # Runs sim in slices until it halts or hits a limit. Returns the limit
+    # error, or None when the program halted; runtime errors propagate.
+    deadline = start + timeout
+    while True:
+        sim.run(max_steps=min(SLICE, max_steps - sim.steps))
+        if not sim.running:
+            return None
+        if sim.steps >= max_steps:
+            return f"StepLimit: exceeded {max_steps} instructions"
+        if time.perf_counter() > deadline:
+            return f"Timeout: exceeded {timeout}s"
+
+
+def run_job(job, max_steps=DEFAULT_MAX_STEPS, timeout=DEFAULT_TIMEOUT, cache=None):
+    start = time.perf_counter()
+    cache = cache if cache is not None else _worker_cache
+    outputs = []
+    result = {"program": job["program"], "name": job.get("name"), "outputs": outputs,
+              "memory_hash": None, "error": None, "instructions": 0, "elapsed": 0.0, "cached": False}
+    try:
+        inputs = job["inputs"]
+        inputs = read_inputs(inputs) if isinstance(inputs, str) else list(inputs)
+        queue = iter(inputs)
+
+        def read():
+            for value in queue:
+                return value
+            raise IndexError("No input remaining.")
+
+        sim = UVSim(input_function=read, output_function=outputs.append, engine="decoded")
+        load_job(sim, job)
+        key = result_key(sim.memory, sim.format, inputs) if cache is not None else None
+        hit = cache.get(key) if key else None
+        # Runs that hit a limit are never stored, so a hit is reusable as long as
+        # it finished within this job's budget.
+        if hit is not None and hit["instructions"] is not None and hit["instructions"] <= max_steps:
+            outputs.extend(hit["outputs"])
+            result.update(memory_hash=memory_hash(hit["memory"]), error=hit["error"],
+                          instructions=hit["instructions"], cached=True)
+            result["elapsed"] = time.perf_counter() - start
+            return result
+        rejected, max_steps = screen(sim, max_steps)
+        if rejected:
+            result.update(memory_hash=memory_hash(sim.memory), error=rejected)
+            result["elapsed"] = time.perf_counter() - start
+            return result
+        error = None
+        try:
+            result["error"] = run_limited(sim, max_steps, timeout, start)
+        except (ValueError, IndexError, ZeroDivisionError, RuntimeError) as e:
+            error = result["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            result["instructions"] = sim.steps
+            result["memory_hash"] = memory_hash(sim.memory)
+        if key and result["error"] == error:
+            cache.put(key, capture(sim, outputs, error))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def screen(sim, max_steps=DEFAULT_MAX_STEPS):
+    # Static check of a loaded job, run in the worker before executing it.
+    # Returns the error for programs that can be rejected outright (or None),
+    # and the step budget to run with, tightened to the static worst case
+    # when one is known.
+    analysis = analyze(sim)
+    if analysis.non_terminating:
+        loops = ", ".join(f"{loop[0]:03d}" for loop in analysis.infinite_loops)
+        return f"NonTerminating: program can never halt (loop at {loops})", max_steps
+    if analysis.worst_case is not None:
+        return None, min(max_steps, analysis.worst_case)
+    return None, max_steps
+
+
+def run_batch(source, jobs=None, max_steps=DEFAULT_MAX_STEPS, timeout=DEFAULT_TIMEOUT, out=sys.stdout,
+              cache_dir=None, cache_bytes=DEFAULT_DISK_BYTES):
+    failed = 0
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count(), initializer=_init_worker,
+                             initargs=(cache_dir, cache_bytes)) as pool:
+        futures = [pool.submit(run_job, job, max_steps, timeout) for job in find_jobs(source)]
+        for future in as_completed(futures):
+            result = future.result()
+            if result["error"]:
+                failed += 1
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    return failed
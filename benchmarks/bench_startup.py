@@ -0,0 +1,76 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUI_MODULES = ("tkinter", "gui", "json")
+
+IMPORT_PROBE = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import main\n"
+    "elapsed = time.perf_counter() - t\n"
+    "print(elapsed, ','.join(m for m in {mods!r} if m in sys.modules))\n"
+)
+
+
+def measure_import(repeat):
+    times = []
+    loaded = ""
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE.format(mods=GUI_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        times.append(float(out[0]))
+        loaded = out[1] if len(out) > 1 else ""
+    return statistics.median(times), loaded
+
+
+def measure_first_instruction(repeat):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("+1100\n+4300\n")
+        program = f.name
+    times = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            proc = subprocess.Popen(
+                [sys.executable, os.path.join(ROOT, "main.py"), program],
+                cwd=ROOT, stdout=subprocess.PIPE, text=True,
+            )
+            proc.stdout.readline()
+            times.append(time.perf_counter() - start)
+            proc.communicate()
+    finally:
+        os.unlink(program)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure headless CLI startup cost")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--max-import-ms", type=float, default=None,
+                        help="exit non-zero when importing main takes longer than this")
+    args = parser.parse_args()
+
+    import_time, loaded = measure_import(args.repeat)
+    first = measure_first_instruction(args.repeat)
+    print(json.dumps({
+        "import_main_ms": round(import_time * 1000, 3),
+        "first_instruction_ms": round(first * 1000, 3),
+        "gui_modules_loaded": loaded.split(",") if loaded else [],
+    }))
+    if loaded:
+        sys.exit(f"Headless import pulled in GUI modules: {loaded}")
+    if args.max_import_ms is not None and import_time * 1000 > args.max_import_ms:
+        sys.exit(f"Importing main took {import_time * 1000:.1f}ms (limit {args.max_import_ms}ms)")
+
+
+if __name__ == "__main__":
+    main()
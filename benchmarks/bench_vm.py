@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from uvsim import UVSim
+from benchmarks.workloads import WORKLOADS
+
+ENGINES = ("interp", "decoded", "compiled")
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+
+def bench(workload, engine, repeat):
+    lines, inputs = WORKLOADS[workload]()
+
+    sim = UVSim(engine=engine)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        sim.load(lines)
+    load_time = (time.perf_counter() - start) / repeat
+
+    best = None
+    instructions = 0
+    for _ in range(repeat):
+        feed = iter(inputs)
+        sim = UVSim(input_function=lambda: next(feed), output_function=lambda value: None, engine=engine)
+        sim.load(lines)
+        start = time.perf_counter()
+        instructions = sim.run(max_steps=10**9)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return {
+        "instructions": instructions,
+        "load_us": round(load_time * 1e6, 2),
+        "run_ms": round(best * 1e3, 3),
+        "ips": round(instructions / best),
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old and result["ips"] < old["ips"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['ips']} instr/s vs baseline {old['ips']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure UVSim load time, run latency and instructions/sec")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--engine", action="append", choices=ENGINES, help="engine(s) to measure (default: all)")
+    parser.add_argument("--workload", action="append", choices=sorted(WORKLOADS), help="workload(s) to run (default: all)")
+    parser.add_argument("--save", nargs="?", const=BASELINE, metavar="PATH", help="write results as the new baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE, metavar="PATH", help="fail on instructions/sec regressions against a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed instructions/sec drop for --compare (default: 0.2)")
+    args = parser.parse_args()
+
+    results = {}
+    for workload in args.workload or WORKLOADS:
+        for engine in args.engine or ENGINES:
+            name = f"{workload}/{engine}"
+            results[name] = bench(workload, engine, args.repeat)
+            r = results[name]
+            print(f"{name:<28} {r['instructions']:>9} instr  {r['ips']:>11,} instr/s  "
+                  f"run {r['run_ms']:>9.3f}ms  load {r['load_us']:>8.2f}us")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent=4)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from uvsim import convert_4_to_6
+
+
+def _image(words, size):
+    image = [0] * size
+    for address, word in words.items():
+        image[address] = word
+    return image
+
+
+def _lines(image, digits):
+    return [f"{'-' if w < 0 else '+'}{abs(w):0{digits}d}" for w in image]
+
+
+def counting_loop(iterations=9999):
+    words = {
+        0: 2010, 1: 3111, 2: 2110, 3: 4205, 4: 4000, 5: 4300,
+        10: iterations, 11: 1,
+    }
+    return _lines(_image(words, 12), 4), []
+
+
+def summing_loop(iterations=5000):
+    # Adds the counter into a running total on every pass, so the loop has no
+    # closed form and every engine executes each pass.
+    words = {
+        0: 2020, 1: 3021, 2: 2120, 3: 2021, 4: 3122, 5: 2121, 6: 4208, 7: 4000, 8: 4300,
+        21: iterations, 22: 1,
+    }
+    return _lines(_image(words, 23), 4), []
+
+
+def arithmetic_kernel(iterations=5000):
+    words = {
+        0: 2020, 1: 3321, 2: 3022, 3: 3223, 4: 2120,
+        5: 2024, 6: 3125, 7: 2124, 8: 4210, 9: 4000, 10: 4300,
+        20: 1, 21: 3, 22: 7, 23: 2, 24: iterations, 25: 1,
+    }
+    return _lines(_image(words, 26), 4), []
+
+
+def io_heavy(iterations=5000):
+    words = {
+        0: 1020, 1: 1120, 2: 2021, 3: 3122, 4: 2121, 5: 4207, 6: 4000, 7: 4300,
+        21: iterations, 22: 1,
+    }
+    return _lines(_image(words, 23), 4), [7] * iterations
+
+
+def large_image(iterations=200):
+    words = {}
+    for i in range(196):
+        words[i] = (20, 30, 31, 21)[i % 4] * 1000 + 230 + i % 8
+    words.update({
+        196: 20240, 197: 31241, 198: 21240, 199: 42201, 200: 40000, 201: 43000,
+        240: iterations, 241: 1,
+    })
+    for i in range(8):
+        words[230 + i] = 1000 * (i + 1)
+    return _lines(_image(words, 250), 6), []
+
+
+def converted_loop(iterations=9999):
+    lines, inputs = counting_loop(iterations)
+    return convert_4_to_6(lines), inputs
+
+
+WORKLOADS = {
+    "counting_loop": counting_loop,
+    "summing_loop": summing_loop,
+    "arithmetic_kernel": arithmetic_kernel,
+    "io_heavy": io_heavy,
+    "large_image": large_image,
+    "converted_loop": converted_loop,
+}
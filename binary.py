@@ -0,0 +1,143 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from uvsim import UVSim
+
+# A binary file is a sequence of records, one per program:
+#   magic "UVSB", version, word format (digits per word), name length, word count,
+#   CRC-32 of the words (all little-endian), the UTF-8 name padded to a
+#   multiple of 4 bytes, then the words as signed 32-bit integers.
+# A single program is an archive with one record.
+MAGIC = b"UVSB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHII")
+EXTENSION = ".uvb"
+
+
+def encode(lines, memory_size=250):
+    # memory_size is the machine the program is written for; above 1000
+    # words it may use wider words.
+    sim = UVSim(memory_size=memory_size)
+    sim.load(lines)
+    return sim.format, sim.memory[:len(lines)]
+
+
+def pack(name, fmt, words):
+    words = array("i", words)
+    if sys.byteorder == "big":
+        words.byteswap()
+    payload = words.tobytes()
+    name = name.encode()
+    name += b"\0" * (-len(name) % 4)
+    return HEADER.pack(MAGIC, VERSION, fmt, len(name), len(words), zlib.crc32(payload)) + name + payload
+
+
+def write_archive(path, programs, memory_size=250):
+    # programs: iterable of (name, lines) with lines as accepted by UVSim.load.
+    with open(path, "wb") as f:
+        for name, lines in programs:
+            fmt, words = encode(lines, memory_size)
+            f.write(pack(name, fmt, words))
+
+
+def convert(paths, out, memory_size=250):
+    programs = []
+    for path in paths:
+        with open(path, "r") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        programs.append((os.path.splitext(os.path.basename(path))[0], lines))
+    write_archive(out, programs, memory_size)
+
+
+def is_binary(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class Archive:
+    # Memory-maps an archive and indexes its records. Words are only copied out
+    # of the mapping when a program is loaded into a VM. With data given, the
+    # archive is read from that bytes-like object instead and path only names it.
+    def __init__(self, path, data=None):
+        self.path = path
+        if data is None:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        else:
+            self._map = data
+            size = len(data)
+        self.records = {}
+        offset = 0
+        while offset < size:
+            if size - offset < HEADER.size:
+                raise ValueError(f"Truncated record header at byte {offset} in {path}")
+            magic, version, fmt, name_len, length, checksum = HEADER.unpack_from(self._map, offset)
+            if magic != MAGIC:
+                raise ValueError(f"Not a UVSim binary program: {path}")
+            if version != VERSION:
+                raise ValueError(f"Unsupported binary program version {version} in {path}")
+            offset += HEADER.size
+            name = bytes(self._map[offset:offset + name_len]).rstrip(b"\0").decode()
+            offset += name_len
+            end = offset + 4 * length
+            if end > size:
+                raise ValueError(f"Truncated program '{name}' in {path}")
+            self.records[name] = (fmt, offset, end, checksum)
+            offset = end
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def words(self, name):
+        fmt, start, end, checksum = self.records[name]
+        view = memoryview(self._map)[start:end]
+        try:
+            if zlib.crc32(view) != checksum:
+                raise ValueError(f"Checksum mismatch for program '{name}' in {self.path}")
+            words = array("i")
+            words.frombytes(view)
+        finally:
+            view.release()
+        if sys.byteorder == "big":
+            words.byteswap()
+        return fmt, words
+
+    def load(self, sim, name=None):
+        if name is None:
+            if len(self.records) != 1:
+                raise ValueError(f"Archive {self.path} holds {len(self.records)} programs; name one")
+            name = next(iter(self.records))
+        fmt, words = self.words(name)
+        sim.load_words(words, fmt)
+
+
+def load_file(sim, path, name=None):
+    with Archive(path) as archive:
+        archive.load(sim, name)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Pack BasicML programs into a binary archive")
+    parser.add_argument("out", metavar=f"OUT{EXTENSION}")
+    parser.add_argument("programs", nargs="+", metavar="PROGRAM.txt")
+    parser.add_argument("--memory-size", type=int, default=250, metavar="WORDS", help="words of VM memory the programs are written for (default: 250)")
+    args = parser.parse_args()
+    convert(args.programs, args.out, args.memory_size)
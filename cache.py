@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import tempfile
+from array import array
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_DISK_BYTES = 64 * 1024 * 1024
+ERRORS = {cls.__name__: cls for cls in (ValueError, IndexError, ZeroDivisionError, RuntimeError)}
+
+
+def result_key(memory, fmt, inputs=(), interactive=False):
+    # Execution is deterministic given the loaded image, the word format and
+    # the input sequence, so together they identify the result of a run.
+    # Interactive keys name runs that never executed a READ: a run given an
+    # empty input list may have failed on one, where a prompt would not.
+    h = hashlib.sha256(array("i", memory).tobytes())
+    h.update(f"|{fmt}|".encode())
+    h.update(",".join(str(int(v)) for v in inputs).encode())
+    if interactive:
+        h.update(b"|interactive")
+    return h.hexdigest()
+
+
+def capture(sim, outputs, error=None):
+    return {
+        "outputs": list(outputs),
+        "memory": list(sim.memory),
+        "accumulator": sim.accumulator,
+        "instruction_pointer": sim.instruction_pointer,
+        "error": error,
+        "instructions": sim.steps or None,
+    }
+
+
+def replay(sim, result):
+    # Puts the VM in the state the cached run finished in and re-emits its
+    # output, then re-raises its error (if any) as the run would have.
+    sim.memory[:] = array("i", result["memory"])
+    sim.accumulator = result["accumulator"]
+    sim.instruction_pointer = result["instruction_pointer"]
+    sim.running = False
+    if result["instructions"] is not None:
+        sim.steps = result["instructions"]
+    for value in result["outputs"]:
+        sim.output_function(value)
+    if result["error"]:
+        name, _, message = result["error"].partition(": ")
+        raise ERRORS.get(name, RuntimeError)(message)
+
+
+class ResultCache:
+    def __init__(self, capacity=DEFAULT_CAPACITY, directory=None, max_bytes=DEFAULT_DISK_BYTES):
+        self.capacity = capacity
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._disk_bytes = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+        if self.directory:
+            path = self._path(key)
+            try:
+                with open(path, "r") as f:
+                    result = json.load(f)
+                os.utime(path)
+            except (OSError, ValueError):
+                result = None
+            if result is not None:
+                self._remember(key, result)
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def put(self, key, result):
+        self._remember(key, result)
+        if not self.directory:
+            return
+        data = json.dumps(result).encode()
+        if len(data) > self.max_bytes:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        else:
+            self._disk_bytes += len(data)
+        if self._disk_bytes > self.max_bytes:
+            self._evict()
+
+    def _remember(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def _disk_entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
+
+    def _evict(self):
+        # Least recently used first: get() touches the mtime of every disk hit.
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._disk_bytes = total
+
+
+def run_cached(sim, cache, inputs=None):
+    # Runs a freshly loaded VM through the cache. With inputs=None the VM reads
+    # through its own input_function, so only a cached run that never executed
+    # a READ can be reused; the run is stored under the values it actually
+    # consumed, and under the interactive key when it read nothing.
+    image = sim.memory[:]
+    hit = cache.get(result_key(image, sim.format, inputs or (), interactive=inputs is None))
+    if hit is not None:
+        replay(sim, hit)
+        return
+    consumed, outputs = [], []
+    reads = 0
+    read, write = sim.input_function, sim.output_function
+
+    def recording_read():
+        nonlocal reads
+        reads += 1
+        value = read()
+        consumed.append(value)
+        return value
+
+    def recording_write(value):
+        outputs.append(value)
+        write(value)
+
+    sim.input_function, sim.output_function = recording_read, recording_write
+
+    def store(error):
+        result = capture(sim, outputs, error)
+        cache.put(result_key(image, sim.format, consumed if inputs is None else inputs), result)
+        if not reads:
+            cache.put(result_key(image, sim.format, interactive=True), result)
+
+    try:
+        sim.run()
+    except tuple(ERRORS.values()) as e:
+        store(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        sim.input_function, sim.output_function = read, write
+    store(None)
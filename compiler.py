@@ -0,0 +1,205 @@
+import hashlib
+import math
+from collections import OrderedDict
+
+CACHE_SIZE = 128
+BRANCHES = (40, 41, 42)
+ARITHMETIC = {30: "+", 31: "-", 33: "*"}
+VALID_OPCODES = (10, 11, 20, 21, 30, 31, 32, 33, 40, 41, 42, 43)
+
+_cache = OrderedDict()
+
+
+def _decode(word, base):
+    return divmod(abs(int(word)), base)
+
+
+class CompiledProgram:
+    def __init__(self, memory, fmt, entry):
+        self.fmt4 = fmt == 4
+        self.base = 100 if self.fmt4 else 10 ** (fmt - 3)
+        self.limit = 9999 if self.fmt4 else 10 ** fmt - 1
+        self.words = list(memory)
+        self.size = len(self.words)
+        self.leaders = set()
+        self.code_addresses = set()
+        self._find_code(entry)
+        self.blocks = {}
+        self.owner = {}
+        source = []
+        for start in sorted(self.leaders):
+            end, lines = self._emit_block(start)
+            if end == start:
+                continue
+            self.blocks[start] = (None, end)
+            for address in range(start, end):
+                self.owner[address] = start
+            source.extend(lines)
+        namespace = {}
+        if source:
+            exec(compile("\n".join(source), "<basicml>", "exec"), namespace)
+        for start, (_, end) in self.blocks.items():
+            self.blocks[start] = (namespace[f"block_{start}"], end)
+
+    def _valid(self, address):
+        if not (0 <= address < self.size):
+            return False
+        opcode, operand = _decode(self.words[address], self.base)
+        if operand >= self.size:
+            # Left to the interpreter, which reports it.
+            return False
+        return opcode in VALID_OPCODES
+
+    def _find_code(self, entry):
+        pending = [entry]
+        while pending:
+            address = pending.pop()
+            if address in self.leaders or not self._valid(address):
+                continue
+            self.leaders.add(address)
+            while self._valid(address):
+                self.code_addresses.add(address)
+                opcode, operand = _decode(self.words[address], self.base)
+                if opcode in BRANCHES:
+                    pending.append(operand)
+                    if opcode != 40:
+                        pending.append(address + 1)
+                    break
+                if opcode == 43:
+                    break
+                address += 1
+                if address in self.leaders:
+                    break
+
+    def _emit_block(self, start):
+        limit = self.limit
+        modulus = limit + 1
+        lines = [f"def block_{start}(sim, mem, acc, invalidate):"]
+        address = start
+        while self._valid(address):
+            if address != start and address in self.leaders:
+                break
+            opcode, a = _decode(self.words[address], self.base)
+            nxt = address + 1
+            sync = f"sim.instruction_pointer = {address}; sim.accumulator = acc"
+            if opcode == 10:
+                lines += [
+                    f"    {sync}",
+                    "    value = int(sim.input_function())",
+                    "    acc = sim.accumulator",
+                    f"    if not -{limit} <= value <= {limit}:",
+                    f"        raise ValueError('Value out of range (-{limit} - {limit})')",
+                    f"    mem[{a}] = value",
+                ]
+            elif opcode == 11:
+                lines += [
+                    f"    {sync}",
+                    f"    sim.output_function(mem[{a}])",
+                    "    acc = sim.accumulator",
+                ]
+            elif opcode == 20:
+                lines.append(f"    acc = mem[{a}]")
+            elif opcode == 21:
+                lines += [
+                    f"    if not -{limit} <= acc <= {limit}:",
+                    f"        {sync}",
+                    f"        raise ValueError('Value out of range (-{limit} - {limit})')",
+                    f"    mem[{a}] = acc",
+                ]
+            elif opcode in ARITHMETIC or opcode == 32:
+                if opcode == 32:
+                    lines += [
+                        f"    if mem[{a}] == 0:",
+                        f"        {sync}",
+                        "        raise ZeroDivisionError('Division by zero.')",
+                        f"    acc = acc // mem[{a}]",
+                    ]
+                else:
+                    lines.append(f"    acc = acc {ARITHMETIC[opcode]} mem[{a}]")
+                lines.append(f"    acc = acc % {modulus} if acc >= 0 else -(-acc % {modulus})")
+            elif opcode == 40:
+                lines.append(f"    return acc, {a}, {nxt - start}")
+                return nxt, lines
+            elif opcode == 41:
+                lines.append(f"    return acc, ({a} if acc < 0 else {nxt}), {nxt - start}")
+                return nxt, lines
+            elif opcode == 42:
+                lines.append(f"    return acc, ({a} if acc == 0 else {nxt}), {nxt - start}")
+                return nxt, lines
+            elif opcode == 43:
+                lines += ["    sim.running = False", f"    return acc, {address}, {nxt - start}"]
+                return nxt, lines
+            if opcode in (10, 11):
+                lines.append(f"    if not sim.running: return acc, {nxt}, {nxt - start}")
+            if opcode in (10, 21) and a in self.code_addresses:
+                lines.append(f"    invalidate({a}); return acc, {nxt}, {nxt - start}")
+            address = nxt
+        lines.append(f"    return acc, {address}, {address - start}")
+        return address, lines
+
+
+def program_key(sim):
+    digest = hashlib.sha256(sim.memory.tobytes())
+    digest.update(f"{sim.format}:{sim.instruction_pointer}".encode())
+    return digest.hexdigest()
+
+
+def get_program(sim):
+    key = program_key(sim)
+    program = _cache.get(key)
+    if program is None:
+        program = CompiledProgram(sim.memory, sim.format, sim.instruction_pointer)
+        _cache[key] = program
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return program
+
+
+def run_compiled(sim, max_steps=None):
+    program = get_program(sim)
+    blocks = program.blocks
+    owner = program.owner
+    code_addresses = program.code_addresses
+    base = program.base
+    mem = sim.memory
+    broken = set()
+
+    def invalidate(address):
+        broken.add(owner.get(address, address))
+
+    acc = sim.accumulator
+    ip = sim.instruction_pointer
+    remaining = math.inf if max_steps is None else max_steps
+    sim.running = True
+    try:
+        while sim.running and remaining > 0:
+            entry = blocks.get(ip)
+            if entry is not None and ip not in broken and remaining >= entry[1] - ip:
+                start = ip
+                try:
+                    acc, ip, count = entry[0](sim, mem, acc, invalidate)
+                except BaseException:
+                    remaining -= sim.instruction_pointer - start
+                    raise
+                remaining -= count
+                continue
+            if 0 <= ip < program.size:
+                opcode, operand = _decode(mem[ip], base)
+                if opcode in (10, 21) and operand in code_addresses:
+                    invalidate(operand)
+            sim.accumulator = acc
+            sim.instruction_pointer = ip
+            sim.step()
+            acc = sim.accumulator
+            ip = sim.instruction_pointer
+            remaining -= 1
+    finally:
+        if max_steps is not None:
+            sim.steps += max_steps - remaining
+    sim.accumulator = acc
+    sim.instruction_pointer = ip
+    if max_steps is not None:
+        return max_steps - remaining
+    return None
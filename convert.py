@@ -0,0 +1,60 @@
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from uvsim import convert_word_4_to_6
+
+CHUNK = 64
+
+
+def convert_file(source, dest):
+    # Streams one program: lines are read, converted and written one at a time,
+    # into a temporary file that only replaces dest once the whole file converted.
+    result = {"source": source, "output": dest, "lines": 0, "error": None}
+    tmp = dest + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        with open(source, "r") as fin, open(tmp, "w") as fout:
+            for number, line in enumerate(fin, 1):
+                if not line.strip():
+                    continue
+                try:
+                    fout.write(convert_word_4_to_6(line) + "\n")
+                except ValueError as e:
+                    raise ValueError(f"line {number}: {e}") from None
+                result["lines"] += 1
+        os.replace(tmp, dest)
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    return result
+
+
+def _convert_pair(pair):
+    return convert_file(*pair)
+
+
+def find_programs(source, dest):
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".txt"):
+                path = os.path.join(root, name)
+                yield path, os.path.join(dest, os.path.relpath(path, source))
+
+
+def convert_tree(source, dest, jobs=None, out=sys.stdout):
+    # Converts every *.txt under source into the same layout under dest, one
+    # JSON line per file. A bad file is reported and skipped; returns the
+    # number of files that failed.
+    failed = 0
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for result in pool.map(_convert_pair, find_programs(source, dest), chunksize=CHUNK):
+            if result["error"]:
+                failed += 1
+            out.write(json.dumps(result) + "\n")
+    out.flush()
+    return failed
@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+BREAKPOINT = "breakpoint"
+WRITE = "write"
+ACCUMULATOR = "accumulator"
+
+# kind is one of the constants above; address is the breakpoint address, the
+# watched word that was written, or the instruction that changed the
+# accumulator; value is the word's new value or the accumulator.
+Hit = namedtuple("Hit", "kind address value")
+
+
+class Debugger:
+    # Attached as sim.debugger. UVSim.run only switches to the checked loop
+    # below while something is armed, so an idle debugger costs nothing per
+    # instruction. A run that stops on a hit leaves the VM running (paused);
+    # calling run() again resumes from the instruction it stopped at.
+    def __init__(self):
+        self.breakpoints = set()
+        self.watchpoints = set()
+        self.conditions = []
+        self.hit = None
+
+    @property
+    def armed(self):
+        return bool(self.breakpoints or self.watchpoints or self.conditions)
+
+    def break_at(self, address):
+        self.breakpoints.add(address)
+
+    def watch(self, address):
+        self.watchpoints.add(address)
+
+    def watch_accumulator(self, condition):
+        # condition is called with the new accumulator after every step that
+        # changes it; the run pauses when it returns true.
+        self.conditions.append(condition)
+        return condition
+
+    def clear(self):
+        self.breakpoints.clear()
+        self.watchpoints.clear()
+        self.conditions.clear()
+        self.hit = None
+
+
+def run_debug(sim, max_steps=None):
+    debugger = sim.debugger
+    breakpoints, watchpoints, conditions = debugger.breakpoints, debugger.watchpoints, debugger.conditions
+    mem = sim.memory
+    size = sim.MAX_MEM
+    base = sim._decode_base()
+    last = debugger.hit
+    # Resuming from a breakpoint executes that instruction instead of stopping again.
+    # The hit is only cleared once a step completes, so a step interrupted by
+    # an exception resumes the same way next time.
+    resume_at = last.address if last is not None and last.kind == BREAKPOINT else None
+    executed = 0
+    sim.running = True
+    try:
+        while sim.running and (max_steps is None or executed < max_steps):
+            ip = sim.instruction_pointer
+            if ip in breakpoints and ip != resume_at:
+                debugger.hit = Hit(BREAKPOINT, ip, None)
+                break
+            resume_at = None
+            watched = None
+            if watchpoints and 0 <= ip < size:
+                opcode, operand = divmod(abs(int(mem[ip])), base)
+                if (opcode == 10 or opcode == 21) and operand in watchpoints:
+                    watched = operand
+            acc = sim.accumulator
+            sim.step()
+            executed += 1
+            debugger.hit = None
+            if watched is not None:
+                debugger.hit = Hit(WRITE, watched, mem[watched])
+                break
+            if conditions and sim.accumulator != acc and any(c(sim.accumulator) for c in conditions):
+                debugger.hit = Hit(ACCUMULATOR, ip, sim.accumulator)
+                break
+    finally:
+        if max_steps is not None:
+            sim.steps += executed
+    if max_steps is not None:
+        return executed
+    return None
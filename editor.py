@@ -0,0 +1,74 @@
+from array import array
+from memory import word_digits
+from uvsim import UVSim, parse_word
+
+
+class EditorImage:
+    # The instruction editor's program, kept encoded as the user types. Each
+    # sync() diffs the editor text against the previous version, re-parses only
+    # the lines in between and patches the word array in place, so Run only
+    # has to copy words into the VM. Lines hold an instruction when they have
+    # a non-empty word after ':'; the n-th such line loads at address n.
+    def __init__(self, memory_size=250):
+        self.memory_size = memory_size
+        self.wide = word_digits(memory_size)
+        self.lines = [""]
+        # Per editor line: None, (value, format), or the word text when malformed.
+        self.entries = [None]
+        # One word per instruction line; malformed words hold 0 until fixed.
+        self.words = array("i")
+        self.formats = {}
+        self.errors = 0
+        self.version = 0
+
+    def _parse(self, line):
+        if ":" not in line:
+            return None
+        word = line.split(":", 1)[1].strip()
+        if not word:
+            return None
+        return parse_word(word, self.wide) or word
+
+    def _count(self, entries, sign):
+        for entry in entries:
+            if isinstance(entry, str):
+                self.errors += sign
+            elif entry is not None:
+                self.formats[entry[1]] = self.formats.get(entry[1], 0) + sign
+
+    def sync(self, text):
+        # Returns the range of (0-based) editor lines that were re-parsed.
+        new = text.split("\n")
+        old = self.lines
+        start = 0
+        common = min(len(old), len(new))
+        while start < common and old[start] == new[start]:
+            start += 1
+        old_end, new_end = len(old), len(new)
+        while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+        if start == old_end == new_end:
+            return range(0)
+        removed = self.entries[start:old_end]
+        entries = [self._parse(line) for line in new[start:new_end]]
+        address = sum(1 for entry in self.entries[:start] if entry is not None)
+        self.words[address:address + sum(1 for entry in removed if entry is not None)] = array(
+            "i", (entry[0] if isinstance(entry, tuple) else 0 for entry in entries if entry is not None))
+        self._count(removed, -1)
+        self._count(entries, 1)
+        self.entries[start:old_end] = entries
+        self.lines = new
+        self.version += 1
+        return range(start, new_end)
+
+    def instructions(self):
+        return [line.split(":", 1)[1].strip() for line, entry in zip(self.lines, self.entries) if entry is not None]
+
+    def image(self):
+        # (words, format) for UVSim.load_words. When something is wrong, load()
+        # re-reads the instructions so the error is exactly the one it reports.
+        used = [fmt for fmt, count in self.formats.items() if count]
+        if self.errors or len(used) > 1 or len(self.words) > self.memory_size:
+            UVSim(memory_size=self.memory_size).load(self.instructions())
+        return self.words, used[0] if used else 6
@@ -0,0 +1,307 @@
+from loops import match_counting_loop, solve
+
+
+def run_decoded(sim, max_steps=None):
+    # The decode tables are kept on the VM between runs, so a program run in
+    # slices is only decoded once. They are rebuilt when the memory object,
+    # the word format or any word changed since the last run ended: a copy of
+    # memory is kept to compare against, which is far cheaper than decoding.
+    cached = sim.decoded
+    if cached is None or cached[0] is not sim.memory or cached[1] != sim.format or cached[2] != sim.memory:
+        cached = sim.decoded = (sim.memory, sim.format, None, _build(sim))
+    try:
+        return cached[3](max_steps)
+    finally:
+        sim.decoded = cached[:2] + (sim.memory[:],) + cached[3:]
+
+
+def _build(sim):
+    mem = sim.memory
+    size = sim.MAX_MEM
+    fmt4 = sim.format == 4
+    base = sim._decode_base()
+    limit = sim._max_word()
+    modulus = limit + 1
+    acc = 0
+    # 4-digit operands can reach past a machine smaller than 100 words, so the
+    # tables cover every address a branch can name; those past the end fail
+    # the way the interpreter does when it fetches them.
+    span = max(size, base) if fmt4 else size
+
+    opcodes = [0] * (span + 1)
+    operands = [0] * (span + 1)
+    plain = [None] * (span + 1)
+    code = [None] * (span + 1)
+    # Marks the words read by an installed superinstruction other than its
+    # first, so a store only looks back for one to drop when it can matter.
+    # Marks are never cleared; a stale one just costs that extra look.
+    covered = bytearray(span + 1)
+    # Superinstructions only replace the handler at the first word of an idiom;
+    # the following words keep their own handlers, so jumping into the middle
+    # of a fused sequence still executes it one instruction at a time. A fused
+    # handler charges the budget for every word it covers, and runs only its
+    # first instruction when fewer steps than that remain.
+    remaining = 0
+
+    def decode(address):
+        opcode, operand = divmod(abs(int(mem[address])), base)
+        opcodes[address] = opcode
+        operands[address] = operand
+        if operand >= size and not fmt4:
+            plain[address] = bad_operand
+        elif operand >= size and opcode in handlers and opcode < 40:
+            plain[address] = interpreted
+        else:
+            plain[address] = handlers.get(opcode, bad_opcode)
+
+    def fuse(address):
+        if not (0 <= address < size - 1) or plain[address] is not load:
+            return
+        words = plain[address:address + 5]
+        if len(words) == 5 and None not in words and bad_operand not in words and interpreted not in words:
+            loop = match_counting_loop(list(zip(opcodes[address:address + 5], operands[address:address + 5])), address)
+        else:
+            loop = None
+        a, b, c = operands[address:address + 3]
+        second, third = plain[address + 1], plain[address + 2]
+        if second is add and third is store:
+            code[address] = load_add_store(a, b, c)
+        elif second is subtract and third is store:
+            code[address] = load_subtract_store(a, b, c)
+        elif second is subtract and third is branchneg:
+            code[address] = load_subtract_branchneg(a, b, c)
+        elif second is branchzero:
+            code[address] = load_branchzero(a, b)
+        if loop is not None:
+            code[address] = counting_loop(*loop, code[address])
+        if code[address] is not plain[address]:
+            for word in range(address + 1, min(address + 5, size)):
+                covered[word] = 1
+
+    def write(address, value):
+        # Written words are re-decoded lazily, the next time they are fetched.
+        # A superinstruction that covers the word is dropped the same way.
+        if not (-limit <= value <= limit):
+            raise ValueError(f"Value out of range (-{limit} - {limit})")
+        mem[address] = value
+        plain[address] = None
+        code[address] = redecode
+        if covered[address]:
+            for start in range(max(address - 4, 0), address):
+                if code[start] is not plain[start]:
+                    code[start] = redecode
+
+    def redecode(operand, ip):
+        for address in range(ip, ip + 5):
+            if address < size and plain[address] is None:
+                decode(address)
+        code[ip] = plain[ip]
+        fuse(ip)
+        return code[ip](operands[ip], ip)
+
+    def read(operand, ip):
+        nonlocal acc
+        sim.accumulator = acc
+        sim.instruction_pointer = ip
+        value = int(sim.input_function())
+        acc = sim.accumulator
+        write(operand, value)
+        return ip + 1
+
+    def output(operand, ip):
+        nonlocal acc
+        sim.accumulator = acc
+        sim.instruction_pointer = ip
+        sim.output_function(mem[operand])
+        acc = sim.accumulator
+        return ip + 1
+
+    def load(operand, ip):
+        nonlocal acc
+        acc = mem[operand]
+        return ip + 1
+
+    def store(operand, ip):
+        write(operand, acc)
+        return ip + 1
+
+    def add(operand, ip):
+        nonlocal acc
+        res = acc + mem[operand]
+        acc = res % modulus if res >= 0 else -(-res % modulus)
+        return ip + 1
+
+    def subtract(operand, ip):
+        nonlocal acc
+        res = acc - mem[operand]
+        acc = res % modulus if res >= 0 else -(-res % modulus)
+        return ip + 1
+
+    def divide(operand, ip):
+        nonlocal acc
+        denom = mem[operand]
+        if denom == 0:
+            raise ZeroDivisionError("Division by zero.")
+        res = acc // denom
+        acc = res % modulus if res >= 0 else -(-res % modulus)
+        return ip + 1
+
+    def multiply(operand, ip):
+        nonlocal acc
+        res = acc * mem[operand]
+        acc = res % modulus if res >= 0 else -(-res % modulus)
+        return ip + 1
+
+    def branch(operand, ip):
+        return operand
+
+    def branchneg(operand, ip):
+        return operand if acc < 0 else ip + 1
+
+    def branchzero(operand, ip):
+        return operand if acc == 0 else ip + 1
+
+    def halt(operand, ip):
+        sim.running = False
+        return ip
+
+    def bad_operand(operand, ip):
+        raise sim._operand_error(operand)
+
+    def interpreted(operand, ip):
+        # A 4-digit operand past the end of memory: the interpreter reports it
+        # (after READ has taken its input), so it runs the instruction.
+        nonlocal acc
+        sim.accumulator = acc
+        sim.instruction_pointer = ip
+        sim._execute(opcodes[ip], operand)
+        acc = sim.accumulator
+        return sim.instruction_pointer
+
+    def bad_opcode(operand, ip):
+        raise RuntimeError(f"Invalid opcode: {opcodes[ip]}")
+
+    def bad_address(operand, ip):
+        raise IndexError(f"Invalid memory address: {ip}")
+
+    def load_add_store(a, b, c):
+        def fused(operand, ip):
+            nonlocal acc, remaining
+            if remaining < 3:
+                return load(operand, ip)
+            remaining -= 2
+            res = mem[a] + mem[b]
+            acc = res % modulus if res >= 0 else -(-res % modulus)
+            write(c, acc)
+            return ip + 3
+        return fused
+
+    def load_subtract_store(a, b, c):
+        def fused(operand, ip):
+            nonlocal acc, remaining
+            if remaining < 3:
+                return load(operand, ip)
+            remaining -= 2
+            res = mem[a] - mem[b]
+            acc = res % modulus if res >= 0 else -(-res % modulus)
+            write(c, acc)
+            return ip + 3
+        return fused
+
+    def load_subtract_branchneg(a, b, target):
+        def fused(operand, ip):
+            nonlocal acc, remaining
+            if remaining < 3:
+                return load(operand, ip)
+            remaining -= 2
+            res = mem[a] - mem[b]
+            acc = res % modulus if res >= 0 else -(-res % modulus)
+            return target if acc < 0 else ip + 3
+        return fused
+
+    def load_branchzero(a, target):
+        def fused(operand, ip):
+            nonlocal acc, remaining
+            if remaining < 2:
+                return load(operand, ip)
+            remaining -= 1
+            acc = mem[a]
+            return target if acc == 0 else ip + 2
+        return fused
+
+    def counting_loop(counter, step, sign, exit_opcode, target, test_first, fallback):
+        # Jumps straight to the loop exit with the final counter value when the
+        # iteration count has a closed form and the budget covers the whole
+        # loop; otherwise runs the loop normally.
+        def fused(operand, ip):
+            nonlocal acc, remaining
+            x0 = mem[counter]
+            d = sign * mem[step]
+            if not (-modulus < x0 < modulus and -modulus < d < modulus):
+                return fallback(operand, ip)
+            if test_first and (x0 == 0 if exit_opcode == 42 else x0 < 0):
+                return fallback(operand, ip)
+            found = solve(x0, d, exit_opcode, modulus)
+            if found is None:
+                return fallback(operand, ip)
+            # Instructions the loop executes: 5 per full pass, and the exiting
+            # pass stops after its branch.
+            cost = 5 * found[0] + 2 if test_first else 5 * found[0] - 1
+            if cost > remaining:
+                # Skip as many whole passes as the budget allows, which end
+                # back at the head with the counter in the accumulator. While
+                # x0 + k*d stays in range no pass truncates, so x_k is exact.
+                passes = remaining // 5
+                x = x0 + passes * d
+                if not passes or not -modulus < x < modulus:
+                    return fallback(operand, ip)
+                remaining -= 5 * passes - 1
+                acc = x
+                write(counter, acc)
+                return ip
+            remaining -= cost - 1
+            acc = found[1]
+            write(counter, acc)
+            return target
+        return fused
+
+    handlers = {
+        10: read, 11: output,
+        20: load, 21: store,
+        30: add, 31: subtract, 32: divide, 33: multiply,
+        40: branch, 41: branchneg, 42: branchzero, 43: halt,
+    }
+
+    # Words are decoded (and fused) the first time they are fetched, so a
+    # large machine only pays for the code it runs.
+    plain[size:] = [bad_address] * (span + 1 - size)
+    code[:] = [redecode] * size + [bad_address] * (span + 1 - size)
+
+    def run(max_steps):
+        nonlocal acc, remaining
+        acc = sim.accumulator
+        ip = sim.instruction_pointer
+        remaining = float("inf") if max_steps is None else max_steps
+        sim.running = True
+        if not (0 <= ip < size):
+            raise IndexError(f"Invalid memory address: {ip}")
+        if max_steps is None:
+            try:
+                while sim.running:
+                    ip = code[ip](operands[ip], ip)
+            finally:
+                sim.accumulator = acc
+                sim.instruction_pointer = ip
+            return None
+
+        try:
+            while sim.running and remaining > 0:
+                ip = code[ip](operands[ip], ip)
+                remaining -= 1
+        finally:
+            sim.accumulator = acc
+            sim.instruction_pointer = ip
+            sim.steps += max_steps - remaining
+        return max_steps - remaining
+
+    return run
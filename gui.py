@@ -1,7 +1,8 @@
 import tkinter as tk
-from tkinter import filedialog, scrolledtext, messagebox, colorchooser
+from tkinter import filedialog, scrolledtext, messagebox, colorchooser, simpledialog
 import os
 import json
+from editor import EditorImage
 
 class UVSimGUI:
     def __init__(self, root):
@@ -11,8 +12,10 @@ class UVSimGUI:
         
         self.current_file_path = None
         self.program_data = []
+        self.watch_addresses = set()
         
         self.load_color_scheme()
+        self.load_output_settings()
         self.apply_color_scheme()
         self.create_menu()
         
@@ -22,7 +25,7 @@ class UVSimGUI:
         left_frame = tk.Frame(main_frame, bg=self.primary_color)
         left_frame.pack(side=tk.LEFT, expand=True, fill="both", padx=(0, 5))
         
-        tk.Label(left_frame, text="Program Instructions (000-249)", 
+        tk.Label(left_frame, text=f"Program Instructions (000-{self.memory_size - 1:03d})", 
                  font=("Courier", 12, "bold"), bg=self.primary_color, 
                  fg=self.off_color).pack()
         
@@ -31,6 +34,13 @@ class UVSimGUI:
             width=40, bg="white", fg="black"
         )
         self.instruction_editor.pack(expand=True, fill="both")
+        self.instruction_editor.tag_config("breakpoint", background="#F4B6B6")
+        self.instruction_editor.tag_config("paused", background="#F9E79F")
+        self.instruction_editor.tag_config("invalid", foreground="#B00020")
+        self.instruction_editor.bind("<F9>", self.toggle_breakpoint)
+        self.editor_image = EditorImage(self.memory_size)
+        self.instruction_editor.bind("<<Modified>>", self.sync_editor)
+        self.root.bind("<F5>", self.continue_program)
         
         right_frame = tk.Frame(main_frame, bg=self.primary_color)
         right_frame.pack(side=tk.RIGHT, expand=True, fill="both")
@@ -91,6 +101,14 @@ class UVSimGUI:
         settingsmenu.add_command(label="Change Color Scheme", command=self.change_colors)
         settingsmenu.add_command(label="Reset to Default Colors", command=self.reset_colors)
         menubar.add_cascade(label="Settings", menu=settingsmenu)
+
+        debugmenu = tk.Menu(menubar, tearoff=0)
+        debugmenu.add_command(label="Toggle Breakpoint (F9)", command=self.toggle_breakpoint)
+        debugmenu.add_command(label="Watch Address...", command=self.add_watchpoint)
+        debugmenu.add_command(label="Clear Breakpoints and Watches", command=self.clear_breakpoints)
+        debugmenu.add_separator()
+        debugmenu.add_command(label="Continue (F5)", command=self.continue_program)
+        menubar.add_cascade(label="Debug", menu=debugmenu)
         
         self.root.config(menu=menubar)
     
@@ -112,12 +130,33 @@ class UVSimGUI:
             self.primary_color = default_primary
             self.off_color = default_off
     
+    def load_output_settings(self):
+        config_file = "config.json"
+        self.scrollback_lines = 10000
+        self.output_fps = 30
+        self.memory_size = 250
+        
+        if os.path.exists(config_file):
+            try:
+                with open(config_file, 'r') as f:
+                    config = json.load(f)
+                    self.scrollback_lines = max(1, int(config.get("scrollback_lines", self.scrollback_lines)))
+                    self.output_fps = max(1, int(config.get("output_fps", self.output_fps)))
+                    self.memory_size = max(1, int(config.get("memory_size", self.memory_size)))
+            except:
+                pass
+    
     def save_color_scheme(self):
         config_file = "config.json"
-        config = {
-            "primary_color": self.primary_color,
-            "off_color": self.off_color
-        }
+        config = {}
+        if os.path.exists(config_file):
+            try:
+                with open(config_file, 'r') as f:
+                    config = json.load(f)
+            except:
+                config = {}
+        config["primary_color"] = self.primary_color
+        config["off_color"] = self.off_color
         
         with open(config_file, 'w') as f:
             json.dump(config, f, indent=4)
@@ -174,23 +213,24 @@ class UVSimGUI:
                 lines = f.readlines()
                 self.program_data = []
                 self.instruction_editor.delete(1.0, tk.END)
+                text = []
                 
                 for i, line in enumerate(lines):
-                    if i >= 100:
+                    if i >= self.memory_size:
                         self.output_screen.insert(
                             tk.END,
-                            f"Warning: File has more than 100 entries. Only first 100 loaded.\n"
+                            f"Warning: File has more than {self.memory_size} entries. "
+                            f"Only first {self.memory_size} loaded.\n"
                         )
                         break
                     
                     line = line.strip()
                     if line:
                         self.program_data.append(line)
-                        self.instruction_editor.insert(
-                            tk.END,
-                            f"{i:02d}: {line}\n"
-                        )
+                        text.append(f"{i:02d}: {line}\n")
                 
+                # One insert, so the editor re-parses the program once.
+                self.instruction_editor.insert(tk.END, "".join(text))
                 self.output_screen.insert(
                     tk.END,
                     f"Loaded {len(self.program_data)} instructions from {file_path}\n"
@@ -235,11 +275,11 @@ class UVSimGUI:
                         if instruction:
                             instructions.append(instruction)
             
-            if len(instructions) > 100:
-                instructions = instructions[:100]
+            if len(instructions) > self.memory_size:
+                instructions = instructions[:self.memory_size]
                 messagebox.showwarning(
                     "Too Many Instructions",
-                    "Only the first 100 instructions were saved."
+                    f"Only the first {self.memory_size} instructions were saved."
                 )
             
             with open(file_path, 'w') as f:
@@ -259,6 +299,66 @@ class UVSimGUI:
     
     def run_program(self):
         pass
+
+    def continue_program(self, event=None):
+        pass
+
+    def toggle_breakpoint(self, event=None):
+        line = self.instruction_editor.index("insert").split(".")[0]
+        if "breakpoint" in self.instruction_editor.tag_names(f"{line}.0"):
+            self.instruction_editor.tag_remove("breakpoint", f"{line}.0", f"{line}.end+1c")
+        else:
+            self.instruction_editor.tag_add("breakpoint", f"{line}.0", f"{line}.end+1c")
+        return "break"
+
+    def add_watchpoint(self):
+        address = simpledialog.askinteger("Watch Address", f"Pause when this address is written (000-{self.memory_size - 1:03d}):",
+                                          minvalue=0, maxvalue=self.memory_size - 1, parent=self.root)
+        if address is not None:
+            self.watch_addresses.add(address)
+            self.output_screen.insert(tk.END, f"Watching writes to {address:03d}\n")
+            self.output_screen.see(tk.END)
+
+    def clear_breakpoints(self):
+        self.instruction_editor.tag_remove("breakpoint", "1.0", tk.END)
+        self.watch_addresses.clear()
+
+    def sync_editor(self, event=None):
+        # Bound to <<Modified>>: re-parses only the lines that changed since
+        # the last sync and marks malformed words. Resetting the modified flag
+        # fires the event again, which returns here at once.
+        editor = self.instruction_editor
+        if not editor.edit_modified():
+            return
+        dirty = self.editor_image.sync(editor.get("1.0", "end-1c"))
+        if dirty:
+            editor.tag_remove("invalid", f"{dirty.start + 1}.0", f"{dirty.stop}.end")
+            for index in dirty:
+                if isinstance(self.editor_image.entries[index], str):
+                    editor.tag_add("invalid", f"{index + 1}.0", f"{index + 1}.end")
+        editor.edit_modified(False)
+
+    def _instruction_lines(self):
+        # (editor line number, memory address) for every line holding an
+        # instruction, numbered the way Run loads them.
+        self.sync_editor()
+        address = 0
+        for number, entry in enumerate(self.editor_image.entries, 1):
+            if entry is not None:
+                yield number, address
+                address += 1
+
+    def editor_breakpoints(self):
+        return {address for number, address in self._instruction_lines()
+                if "breakpoint" in self.instruction_editor.tag_names(f"{number}.0")}
+
+    def highlight_address(self, address=None):
+        self.instruction_editor.tag_remove("paused", "1.0", tk.END)
+        for number, line_address in self._instruction_lines():
+            if line_address == address:
+                self.instruction_editor.tag_add("paused", f"{number}.0", f"{number}.end+1c")
+                self.instruction_editor.see(f"{number}.0")
+                break
     
     def reset_program(self):
         self.instruction_editor.delete(1.0, tk.END)
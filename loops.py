@@ -0,0 +1,58 @@
+from math import gcd
+
+LOAD, STORE, ADD, SUBTRACT = 20, 21, 30, 31
+BRANCH, BRANCHNEG, BRANCHZERO = 40, 41, 42
+
+
+def match_counting_loop(words, head):
+    # words holds the (opcode, operand) pairs at head..head+4. Two shapes are
+    # recognised, each a single counter updated by a constant with no I/O:
+    #   LOAD c / ADD|SUBTRACT k / STORE c / BRANCHZERO|BRANCHNEG exit / BRANCH head
+    #   LOAD c / BRANCHZERO|BRANCHNEG exit / ADD|SUBTRACT k / STORE c / BRANCH head
+    # Returns (counter, step, sign, exit_opcode, exit_target, test_first) or None.
+    (o0, a0), (o1, a1), (o2, a2), (o3, a3), (o4, a4) = words
+    if o0 != LOAD or o4 != BRANCH or a4 != head:
+        return None
+    if o1 in (ADD, SUBTRACT) and o2 == STORE and o3 in (BRANCHNEG, BRANCHZERO):
+        counter, step, arith, store, exit_opcode, exit_target, test_first = a0, a1, o1, a2, o3, a3, False
+    elif o1 in (BRANCHNEG, BRANCHZERO) and o2 in (ADD, SUBTRACT) and o3 == STORE:
+        counter, step, arith, store, exit_opcode, exit_target, test_first = a0, a2, o2, a3, o1, a1, True
+    else:
+        return None
+    if store != counter or step == counter or head <= counter < head + 5:
+        return None
+    return counter, step, 1 if arith == ADD else -1, exit_opcode, exit_target, test_first
+
+
+def solve(x0, d, exit_opcode, modulus):
+    # Iterates x -> truncate(x + d) from x0 and returns (n, x_n) for the
+    # smallest n >= 1 where x_n satisfies the exit branch, or None when the
+    # loop never exits or the case is not handled (the caller then executes
+    # it normally). truncate keeps the sign and reduces the magnitude modulo
+    # `modulus`, which for |x|, |d| < modulus is a single +/- modulus wrap.
+    if d == 0:
+        x_exits = x0 == 0 if exit_opcode == BRANCHZERO else x0 < 0
+        return (1, x0) if x_exits else None
+    if exit_opcode == BRANCHZERO:
+        if d < 0:
+            found = solve(-x0, -d, exit_opcode, modulus)
+            return found and (found[0], -found[1])
+        base = 0
+        if x0 < 0:
+            # Climb towards zero without wrapping.
+            base = (-x0 + d - 1) // d
+            x0 += base * d
+            if x0 == 0:
+                return base, 0
+        # From here x stays in [0, modulus) and x_m = (x0 + m*d) mod modulus.
+        g = gcd(d, modulus)
+        if x0 % g:
+            return None
+        period = modulus // g
+        m = (-x0 // g) * pow(d // g, -1, period) % period
+        return base + (m or period), 0
+
+    if exit_opcode == BRANCHNEG and d < 0 and x0 >= 0:
+        n = x0 // -d + 1
+        return n, x0 + n * d
+    return None
@@ -1,31 +1,133 @@
 import sys
+import argparse
 from uvsim import *
-from gui import *
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="UVSim BasicML simulator")
+    parser.add_argument("file", nargs="?", help="BasicML program to run (opens the GUI when omitted)")
+    parser.add_argument("--name", help="program to run from a multi-program .uvb archive")
+    parser.add_argument("--batch", metavar="SOURCE", help="directory of programs or JSON-lines manifest to run in parallel")
+    parser.add_argument("--convert", nargs=2, metavar=("SRC", "DEST"), help="convert every 4-digit *.txt program under SRC to 6-digit format under DEST")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes for --batch and --convert (default: CPU count)")
+    parser.add_argument("--max-steps", type=int, default=None, help="instruction budget per program in --batch or per CPU with --cpus")
+    parser.add_argument("--timeout", type=float, default=None, help="wall-clock seconds per program in --batch or per CPU with --cpus")
+    parser.add_argument("--input", metavar="FILE", help="take READ values from FILE ('-' for stdin) instead of prompting")
+    parser.add_argument("--inputs", metavar="LIST", help="take READ values from a comma-separated list, e.g. 5,7")
+    parser.add_argument("--output-format", choices=("text", "json"), default="text", help="print WRITE values one per line, or a single JSON document with the final state")
+    parser.add_argument("--memory-size", type=int, default=250, metavar="WORDS", help="words of VM memory; above 1000, programs may use wider words (default: 250)")
+    parser.add_argument("--memory-kind", choices=("dense", "paged"), default=None, help="memory layout (default: dense up to 65536 words, paged above)")
+    parser.add_argument("--cpus", type=int, default=None, metavar="N", help="run the program on N CPUs sharing memory, one process each, and print each CPU's result as a JSON line")
+    parser.add_argument("--analyze", action="store_true", help="print a static analysis of the program as JSON instead of running it")
+    parser.add_argument("--cache-dir", metavar="DIR", help="reuse results of identical runs from an on-disk cache in DIR")
+    parser.add_argument("--cache-size", type=int, default=64, metavar="MB", help="size limit of the on-disk result cache (default: 64)")
+    parser.add_argument("--profile", action="store_true", help="print a per-opcode and per-address hot-spot report after the run")
+    parser.add_argument("--profile-json", metavar="PATH", help="also write the profile as JSON to PATH (implies --profile)")
+    return parser.parse_args(argv)
 
 def main():
-    if len(sys.argv) >= 2:
-        file = sys.argv[1]
-        with open(file, "r") as f:
-            lines = [line.strip() for line in f if line.strip()]
+    args = parse_args(sys.argv[1:])
+    if args.convert:
+        from convert import convert_tree
+        failed = convert_tree(*args.convert, jobs=args.jobs)
+        sys.exit(1 if failed else 0)
+
+    if args.batch:
+        from batch import run_batch, DEFAULT_MAX_STEPS, DEFAULT_TIMEOUT
+        failed = run_batch(
+            args.batch, jobs=args.jobs,
+            max_steps=DEFAULT_MAX_STEPS if args.max_steps is None else args.max_steps,
+            timeout=DEFAULT_TIMEOUT if args.timeout is None else args.timeout,
+            cache_dir=args.cache_dir, cache_bytes=args.cache_size * 1024 * 1024,
+        )
+        sys.exit(1 if failed else 0)
 
-        sim = UVSim()
-        sim.load(lines)
+    if args.file:
+        file = args.file
+        sim = UVSim(memory_size=args.memory_size, memory_kind=args.memory_kind)
+        if file.endswith(".uvb"):
+            from binary import load_file
+            load_file(sim, file, args.name)
+        else:
+            with open(file, "r") as f:
+                lines = [line.strip() for line in f if line.strip()]
+            sim.load(lines)
+        if args.analyze:
+            import json
+            from analysis import analyze
+            analysis = analyze(sim)
+            print(json.dumps(analysis.to_dict(), indent=4))
+            sys.exit(1 if analysis.errors else 0)
+        if args.profile or args.profile_json:
+            from profiler import Profile
+            sim.profile = Profile(sim.MAX_MEM)
+
+        from streams import BufferedWriter, ValueReader, parse_values, prompting, read_values
+        writer = sim.output_function = BufferedWriter(fmt=args.output_format)
+        inputs = None
+        if args.inputs is not None:
+            try:
+                inputs = parse_values(args.inputs)
+            except ValueError as e:
+                print(e, file=sys.stderr)
+                sys.exit(2)
+        elif args.input is not None:
+            try:
+                inputs = read_values(args.input)
+            except OSError as e:
+                print(f"Cannot read input file: {e}", file=sys.stderr)
+                sys.exit(2)
+        if args.cpus:
+            from batch import DEFAULT_MAX_STEPS, DEFAULT_TIMEOUT
+            from multicore import run_machine
+            failed = run_machine(sim, args.cpus, list(inputs or ()),
+                                 max_steps=DEFAULT_MAX_STEPS if args.max_steps is None else args.max_steps,
+                                 timeout=DEFAULT_TIMEOUT if args.timeout is None else args.timeout)
+            sys.exit(1 if failed else 0)
+        if inputs is not None:
+            if args.cache_dir:
+                inputs = list(inputs)
+            sim.input_function = ValueReader(inputs)
+        else:
+            sim.input_function = prompting(sim.input_function, writer)
+
+        error = None
         try:
-            sim.run()
+            if args.cache_dir and sim.profile is None:
+                from cache import ResultCache, run_cached
+                run_cached(sim, ResultCache(directory=args.cache_dir, max_bytes=args.cache_size * 1024 * 1024), inputs)
+            else:
+                sim.run()
         except (ValueError, IndexError, ZeroDivisionError, RuntimeError) as e:
-            print(f"Runtime error: {e}")
+            error = str(e)
+        finally:
+            writer.close(sim, error)
+            if sim.profile is not None:
+                print(sim.profile.report(), file=sys.stderr)
+                if args.profile_json:
+                    sim.profile.save(args.profile_json)
+        if error is not None:
             sys.exit(1)
         return
 
     import threading, queue, tkinter as tk
     from tkinter import filedialog, messagebox
+    from gui import UVSimGUI
 
     class GUIRunner(UVSimGUI):
         def __init__(self, root):
             super().__init__(root)
             import threading, queue
             self._inbox = queue.Queue()
-            self.sim = UVSim(input_function=self._gui_input, output_function=self._gui_output)
+            self.sim = UVSim(input_function=self._gui_input, output_function=self._gui_output,
+                             memory_size=self.memory_size)
+            self._blank_image = self.sim.snapshot()
+            self._loaded_version = None
+            self._loaded_image = None
+
+            from debugger import Debugger
+            self.debugger = Debugger()
+            self.sim.debugger = self.debugger
+            self._resume = threading.Event()
 
             self.enter_button.config(command=self._enter_click)
             self.run_button.config(command=self._run_from_editor)
@@ -35,8 +137,33 @@ def main():
             
             self.reset_button.config(command=self._reset)
 
+            from collections import deque
+            self._pending_output = deque(maxlen=self.scrollback_lines)
+            self._frame_ms = max(1, 1000 // self.output_fps)
+            self.root.after(self._frame_ms, self._output_tick)
+
         def _gui_output(self, value):
-            self.root.after(0, lambda: self._append(str(value)))
+            self._pending_output.append(str(value))
+
+        def _output_tick(self):
+            self._flush_output()
+            self.root.after(self._frame_ms, self._output_tick)
+
+        def _flush_output(self):
+            pending = self._pending_output
+            if not pending:
+                return
+            lines = []
+            try:
+                while True:
+                    lines.append(pending.popleft())
+            except IndexError:
+                pass
+            self.output_screen.insert(tk.END, "\n".join(lines) + "\n")
+            total = int(self.output_screen.index("end-1c").split(".")[0])
+            if total > self.scrollback_lines:
+                self.output_screen.delete("1.0", f"{total - self.scrollback_lines}.0")
+            self.output_screen.see(tk.END)
 
         def _gui_input(self) -> int:
             while True:
@@ -64,6 +191,7 @@ def main():
         def _stop_if_running(self):
             if self._runner_thread and self._runner_thread.is_alive():
                 self.sim.running = False
+                self._resume.set()
                 try:
                     self._inbox.put_nowait(0)
                 except Exception:
@@ -74,16 +202,20 @@ def main():
             self._stop_if_running()
             import queue
             self._inbox = queue.Queue()
-            self.sim = UVSim(input_function=self._gui_input, output_function=self._gui_output)
+            self._pending_output.clear()
+            self.sim.restore(self._blank_image)
+            self._loaded_version = None
+            self._loaded_image = None
             self.output_screen.delete("1.0", tk.END)
             self.user_input.delete(0, tk.END)
             self.output_screen.insert(tk.END, "Click 'File -> Open' to upload a text file with BasicML commands to start.\n")
             self.output_screen.see(tk.END)
+            self.highlight_address(None)
             self._set_running(False)
 
         def _append(self, text: str):
-            self.output_screen.insert(tk.END, text + "\n")
-            self.output_screen.see(tk.END)
+            self._pending_output.append(text)
+            self._flush_output()
 
         def handle_enter(self, event=None):
             user_text = self.user_input.get()
@@ -97,20 +229,32 @@ def main():
         def _enter_click(self):
             self.handle_enter()
 
+        def _arm_debugger(self):
+            self.debugger.breakpoints = self.editor_breakpoints()
+            self.debugger.watchpoints = set(self.watch_addresses)
+
+        def _report_hit(self, hit):
+            if hit.kind == "breakpoint":
+                self._gui_output(f"[Paused at breakpoint {hit.address:03d}] Press F5 to continue")
+                address = hit.address
+            else:
+                self._gui_output(f"[Paused: {hit.address:03d} written = {hit.value}] Press F5 to continue")
+                address = self.sim.instruction_pointer
+            self.root.after(0, lambda: self.highlight_address(address))
+
+        def continue_program(self, event=None):
+            if self._runner_thread and self._runner_thread.is_alive() and self.debugger.hit is not None:
+                self._arm_debugger()
+                self.highlight_address(None)
+                self._resume.set()
+
         def _run_from_editor(self):
-            content = self.instruction_editor.get(1.0, tk.END)
-            lines = content.strip().split('\n')
-            instructions = []
-            
-            for line in lines:
-                if ':' in line:
-                    parts = line.split(':', 1)
-                    if len(parts) == 2:
-                        instruction = parts[1].strip()
-                        if instruction:
-                            instructions.append(instruction)
-            
-            if not instructions:
+            # The editor keeps its program encoded as it is edited, so Run
+            # only copies words into the VM when the text changed since the
+            # last load, and otherwise restores the loaded image.
+            self.sync_editor()
+            image = self.editor_image
+            if not image.words:
                 messagebox.showwarning("No Program", "Load or enter instructions first.")
                 return
             
@@ -119,23 +263,38 @@ def main():
             import queue
             self._inbox = queue.Queue()
             
-            try:
-                self.sim = UVSim(
-                    input_function=self._gui_input,
-                    output_function=self._gui_output
-                )
-                self.sim.load(instructions)
-            except Exception as e:
-                messagebox.showerror("Load Error", f"{e}")
-                return
+            if image.version == self._loaded_version:
+                self.sim.restore(self._loaded_image)
+            else:
+                try:
+                    self.sim.restore(self._blank_image)
+                    self.sim.load_words(*image.image())
+                except Exception as e:
+                    self._loaded_version = None
+                    messagebox.showerror("Load Error", f"{e}")
+                    return
+                self._loaded_version = image.version
+                self._loaded_image = self.sim.snapshot()
             
+            self._arm_debugger()
+            self.debugger.hit = None
             self._append("[Running program from editor…]")
             self._set_running(True)
             
             import threading
             def _run():
                 try:
-                    self.sim.run()
+                    while True:
+                        self.sim.run()
+                        hit = self.debugger.hit
+                        if hit is None or not self.sim.running:
+                            break
+                        # Sleeps until Continue (or Reset/Run) sets the event.
+                        self._resume.clear()
+                        self._report_hit(hit)
+                        self._resume.wait()
+                        if not self.sim.running:
+                            break
                     self._gui_output("[Program halted]")
                 except (ValueError, IndexError, ZeroDivisionError) as e:
                     self._gui_output(f"Runtime error: {e}")
@@ -144,7 +303,7 @@ def main():
                 except Exception as e:
                     self._gui_output(f"Unexpected error: {e}")
                 finally:
-                    self.root.after(0, lambda: self._set_running(False))
+                    self.root.after(0, lambda: (self.highlight_address(None), self._set_running(False)))
             
             self._runner_thread = threading.Thread(target=_run, daemon=True)
             self._runner_thread.start()
@@ -0,0 +1,100 @@
+from array import array
+
+PAGE_BITS = 12
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+DENSE_LIMIT = 1 << 16
+MAX_SIZE = 1_000_000
+
+
+class PagedMemory:
+    # Sparse word store for large address spaces. Behaves like the dense
+    # array("i") for indexing, iteration, copying and comparison, but only
+    # allocates a page of PAGE_SIZE words when a non-zero word is written to
+    # it, so memory use follows the words a program actually touches.
+    __slots__ = ("size", "pages")
+
+    def __init__(self, size, pages=None):
+        self.size = size
+        self.pages = pages if pages is not None else {}
+
+    def __len__(self):
+        return self.size
+
+    def _index(self, address):
+        if address < 0:
+            address += self.size
+        if not (0 <= address < self.size):
+            raise IndexError("array index out of range")
+        return address
+
+    def __getitem__(self, address):
+        if isinstance(address, slice):
+            if address == slice(None):
+                return self.copy()
+            return array("i", (self[i] for i in range(*address.indices(self.size))))
+        address = self._index(address)
+        page = self.pages.get(address >> PAGE_BITS)
+        return 0 if page is None else page[address & PAGE_MASK]
+
+    def __setitem__(self, address, value):
+        if isinstance(address, slice):
+            if address == slice(None) and isinstance(value, PagedMemory) and value.size == self.size:
+                self.pages = {n: page[:] for n, page in value.pages.items()}
+                return
+            targets = range(*address.indices(self.size))
+            if address == slice(None):
+                self.pages = {}
+            for i, word in zip(targets, value):
+                self[i] = word
+            return
+        address = self._index(address)
+        page = self.pages.get(address >> PAGE_BITS)
+        if page is None:
+            if value == 0:
+                return
+            page = self.pages[address >> PAGE_BITS] = array("i", bytes(4 * PAGE_SIZE))
+        page[address & PAGE_MASK] = value
+
+    def __iter__(self):
+        zeros = array("i", bytes(4 * PAGE_SIZE))
+        for n in range((self.size + PAGE_MASK) >> PAGE_BITS):
+            page = self.pages.get(n, zeros)
+            yield from page[:min(PAGE_SIZE, self.size - (n << PAGE_BITS))]
+
+    def __eq__(self, other):
+        if isinstance(other, PagedMemory):
+            return self.size == other.size and list(self) == list(other)
+        try:
+            return len(other) == self.size and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def copy(self):
+        return PagedMemory(self.size, {n: page[:] for n, page in self.pages.items()})
+
+    def tobytes(self):
+        return array("i", self).tobytes()
+
+    @property
+    def allocated(self):
+        return len(self.pages) * PAGE_SIZE
+
+
+def make_memory(size, kind=None):
+    # kind is "dense", "paged" or None to pick by size.
+    if not (1 <= size <= MAX_SIZE):
+        raise ValueError(f"Memory size must be between 1 and {MAX_SIZE}: {size}")
+    if kind is None:
+        kind = "dense" if size <= DENSE_LIMIT else "paged"
+    if kind == "dense":
+        return array("i", bytes(4 * size))
+    if kind == "paged":
+        return PagedMemory(size)
+    raise ValueError(f"Unknown memory kind: {kind}")
+
+
+def word_digits(size):
+    # Widest word format a machine of this size uses: 6 digits (3-digit
+    # operand) up to 1000 words, then one more digit per factor of ten.
+    return max(6, 3 + len(str(size - 1)))
@@ -0,0 +1,248 @@
+import json
+import multiprocessing
+import sys
+import threading
+import time
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+from queue import Empty
+from batch import run_limited, DEFAULT_MAX_STEPS, DEFAULT_TIMEOUT
+from streams import ValueReader
+from uvsim import UVSim
+
+# Atomic read-modify-write opcodes, only understood by CPUs of a Multicore
+# machine. Both leave the word's old value in the accumulator.
+#   FETCH_ADD     mem[operand] += accumulator
+#   TEST_AND_SET  mem[operand] = 1
+FETCH_ADD = 44
+TEST_AND_SET = 45
+
+# Extra wall-clock allowance for collecting results after the CPUs' own timeout.
+GRACE = 5.0
+
+
+class CPU(UVSim):
+    # One processor of a Multicore machine: its own accumulator and
+    # instruction pointer over a memory shared with the other CPUs. Each CPU
+    # starts with its index in the accumulator so programs can split work.
+    __slots__ = ("index", "lock")
+
+    def __init__(self, memory, fmt, index=0, lock=None, entry=0, input_function=None, output_function=None):
+        super().__init__(input_function, output_function, memory_size=len(memory))
+        self.memory = memory
+        self.format = fmt
+        self.index = index
+        self.lock = lock if lock is not None else threading.Lock()
+        self.accumulator = index
+        self.instruction_pointer = entry
+
+    def run(self, max_steps=None):
+        # Other CPUs may rewrite any word at any time, so nothing is decoded or
+        # verified ahead: every fetch decodes the word now in shared memory.
+        # Plain loads and stores go straight to memory; atomics, I/O, HALT and
+        # anything that fails drop to _execute for the interpreter's behaviour.
+        mem = self.memory
+        size = self.MAX_MEM
+        fmt4 = self.format == 4
+        base = self._decode_base()
+        limit = self._max_word()
+        modulus = limit + 1
+        acc = self.accumulator
+        ip = self.instruction_pointer
+        remaining = sys.maxsize if max_steps is None else max_steps
+        self.running = True
+        try:
+            while self.running and remaining > 0:
+                remaining -= 1
+                if not (0 <= ip < size):
+                    raise IndexError(f"Invalid memory address: {ip}")
+                opcode, operand = divmod(abs(mem[ip]), base)
+                if operand >= size:
+                    if not fmt4:
+                        raise self._operand_error(operand)
+                    opcode = -opcode
+                if opcode == 20:
+                    acc = mem[operand]
+                    ip += 1
+                elif opcode == 21:
+                    if not (-limit <= acc <= limit):
+                        raise ValueError(f"Value out of range (-{limit} - {limit})")
+                    mem[operand] = acc
+                    ip += 1
+                elif opcode == 30:
+                    res = acc + mem[operand]
+                    acc = res % modulus if res >= 0 else -(-res % modulus)
+                    ip += 1
+                elif opcode == 31:
+                    res = acc - mem[operand]
+                    acc = res % modulus if res >= 0 else -(-res % modulus)
+                    ip += 1
+                elif opcode == 40:
+                    ip = operand
+                elif opcode == 41:
+                    ip = operand if acc < 0 else ip + 1
+                elif opcode == 42:
+                    ip = operand if acc == 0 else ip + 1
+                else:
+                    # A negated opcode marks an out-of-range 4-digit operand.
+                    self.accumulator = acc
+                    self.instruction_pointer = ip
+                    self._execute(abs(opcode), operand)
+                    acc = self.accumulator
+                    ip = self.instruction_pointer
+        except Exception:
+            remaining += 1
+            raise
+        finally:
+            self.accumulator = acc
+            self.instruction_pointer = ip
+            if max_steps is not None:
+                self.steps += max_steps - remaining
+        if max_steps is not None:
+            return max_steps - remaining
+        return None
+
+    def _execute(self, opcode, operand):
+        if opcode == FETCH_ADD or opcode == TEST_AND_SET:
+            if not (0 <= operand < self.MAX_MEM):
+                raise IndexError(f"Invalid memory address: {operand}")
+            with self.lock:
+                old = self.memory[operand]
+                if opcode == FETCH_ADD:
+                    self.memory[operand] = self._truncate_to_word(old + self.accumulator)
+                else:
+                    self.memory[operand] = 1
+            self.accumulator = old
+            self.instruction_pointer += 1
+        else:
+            super()._execute(opcode, operand)
+
+
+def _run_cpu(name, size, fmt, index, entry, inputs, max_steps, timeout, lock, results):
+    start = time.perf_counter()
+    outputs = []
+    result = {"cpu": index, "outputs": outputs, "error": None, "halted": False,
+              "accumulator": index, "instruction_pointer": entry, "instructions": 0}
+    shm = SharedMemory(name=name)
+    view = shm.buf[:4 * size]
+    memory = view.cast("i")
+    try:
+        cpu = CPU(memory, fmt, index, lock, entry, ValueReader(inputs), outputs.append)
+        try:
+            result["error"] = run_limited(cpu, max_steps, timeout, start)
+        except (ValueError, IndexError, ZeroDivisionError, RuntimeError) as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        result.update(halted=not cpu.running and result["error"] is None, accumulator=cpu.accumulator,
+                      instruction_pointer=cpu.instruction_pointer, instructions=cpu.steps)
+        cpu.memory = None
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        memory.release()
+        view.release()
+        shm.close()
+    result["elapsed"] = time.perf_counter() - start
+    results.put(result)
+
+
+class Multicore:
+    # Several CPUs in separate OS processes over one memory image held in
+    # multiprocessing.shared_memory. Load a program once, then run() starts
+    # every CPU on it and returns one result per CPU. Memory keeps whatever
+    # the CPUs left in it until the next load, so runs can be inspected.
+    def __init__(self, cpus=2, memory_size=250):
+        self.cpus = cpus
+        self.memory_size = memory_size
+        self.format = None
+        self._shm = None
+        self._context = multiprocessing.get_context()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def load(self, lines):
+        sim = UVSim(memory_size=self.memory_size)
+        sim.load(lines)
+        self.load_image(sim)
+
+    def load_image(self, sim):
+        # Copies a loaded single-CPU VM's memory into a fresh shared image.
+        self.close()
+        self.memory_size = sim.MAX_MEM
+        self.format = sim.format
+        self._shm = SharedMemory(create=True, size=4 * self.memory_size)
+        self._shm.buf[:4 * self.memory_size] = sim.memory.tobytes()
+
+    @property
+    def memory(self):
+        words = array("i")
+        if self._shm is None:
+            words.frombytes(bytes(4 * self.memory_size))
+        else:
+            words.frombytes(self._shm.buf[:4 * self.memory_size])
+        return words
+
+    def run(self, inputs=(), entries=None, max_steps=DEFAULT_MAX_STEPS, timeout=DEFAULT_TIMEOUT):
+        # inputs is one list of READ values every CPU reads its own copy of,
+        # or a list of such lists, one per CPU. entries gives each CPU's start
+        # address (default 0 for all).
+        if self._shm is None:
+            raise RuntimeError("No program loaded.")
+        inputs = list(inputs)
+        if not (inputs and isinstance(inputs[0], (list, tuple))):
+            inputs = [inputs] * self.cpus
+        entries = list(entries) if entries is not None else [0] * self.cpus
+        if len(inputs) != self.cpus or len(entries) != self.cpus:
+            raise ValueError(f"Need inputs and entries for each of {self.cpus} CPUs.")
+        lock = self._context.Lock()
+        results = self._context.Queue()
+        processes = [
+            self._context.Process(target=_run_cpu, daemon=True, args=(
+                self._shm.name, self.memory_size, self.format, index, entries[index],
+                list(inputs[index]), max_steps, timeout, lock, results))
+            for index in range(self.cpus)
+        ]
+        for process in processes:
+            process.start()
+        collected = {}
+        deadline = time.perf_counter() + timeout + GRACE
+        try:
+            # Results are read before joining, so a CPU with a lot of output
+            # can't block on a full queue.
+            while len(collected) < self.cpus:
+                try:
+                    result = results.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except Empty:
+                    break
+                collected[result["cpu"]] = result
+        finally:
+            for process in processes:
+                process.join(GRACE)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+        return [collected.get(index) or {"cpu": index, "outputs": [], "error": "Crashed: CPU process exited without a result",
+                                         "halted": False, "accumulator": None, "instruction_pointer": None,
+                                         "instructions": 0}
+                for index in range(self.cpus)]
+
+
+def run_machine(sim, cpus, inputs=(), max_steps=DEFAULT_MAX_STEPS, timeout=DEFAULT_TIMEOUT, out=sys.stdout):
+    # Runs sim's program on a Multicore machine and writes one JSON line per
+    # CPU. Returns the number of CPUs that stopped with an error.
+    with Multicore(cpus, sim.MAX_MEM) as machine:
+        machine.load_image(sim)
+        results = machine.run(inputs, max_steps=max_steps, timeout=timeout)
+    for result in results:
+        out.write(json.dumps(result) + "\n")
+    out.flush()
+    return sum(1 for result in results if result["error"] is not None)
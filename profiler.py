@@ -0,0 +1,105 @@
+import json
+
+OPCODE_NAMES = {
+    10: "READ", 11: "WRITE",
+    20: "LOAD", 21: "STORE",
+    30: "ADD", 31: "SUBTRACT", 32: "DIVIDE", 33: "MULTIPLY",
+    40: "BRANCH", 41: "BRANCHNEG", 42: "BRANCHZERO", 43: "HALT",
+}
+READS = (11, 20, 30, 31, 32, 33)
+WRITES = (10, 21)
+
+
+class Profile:
+    def __init__(self, size=250):
+        self.instructions = 0
+        self.opcodes = {}
+        self.addresses = [0] * size
+        self.taken = [0] * size
+        self.not_taken = [0] * size
+        self.reads = [0] * size
+        self.writes = [0] * size
+        self.words = {}
+
+    def to_dict(self):
+        def sparse(counts):
+            return {str(a): n for a, n in enumerate(counts) if n}
+        return {
+            "instructions": self.instructions,
+            "opcodes": {OPCODE_NAMES.get(op, str(op)): n for op, n in sorted(self.opcodes.items())},
+            "addresses": sparse(self.addresses),
+            "branches": {
+                str(a): {"taken": self.taken[a], "not_taken": self.not_taken[a]}
+                for a in range(len(self.taken)) if self.taken[a] or self.not_taken[a]
+            },
+            "reads": sparse(self.reads),
+            "writes": sparse(self.writes),
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    def report(self, top=10):
+        total = self.instructions or 1
+        lines = [f"Instructions executed: {self.instructions}", "", "Opcodes:"]
+        for op, n in sorted(self.opcodes.items(), key=lambda item: -item[1]):
+            lines.append(f"  {OPCODE_NAMES.get(op, op):<10} {n:>12}  {100 * n / total:5.1f}%")
+
+        lines += ["", f"Hot addresses (top {top}):"]
+        hot = sorted((n, a) for a, n in enumerate(self.addresses) if n)[::-1][:top]
+        for n, a in hot:
+            op, operand = self.words[a]
+            lines.append(f"  {a:03d}  {OPCODE_NAMES.get(op, op):<10} {operand:03d} {n:>12}  {100 * n / total:5.1f}%")
+
+        branches = [a for a in range(len(self.taken)) if self.taken[a] or self.not_taken[a]]
+        if branches:
+            lines += ["", "Branches:"]
+            for a in branches:
+                op, operand = self.words[a]
+                lines.append(f"  {a:03d}  {OPCODE_NAMES[op]:<10} {operand:03d}  taken {self.taken[a]}, not taken {self.not_taken[a]}")
+
+        heat = sorted(((self.reads[a] + self.writes[a], a) for a in range(len(self.reads))
+                       if self.reads[a] or self.writes[a]), reverse=True)[:top]
+        if heat:
+            lines += ["", f"Memory heat (top {top}):"]
+            for _, a in heat:
+                lines.append(f"  {a:03d}  reads {self.reads[a]:>10}  writes {self.writes[a]:>10}")
+        return "\n".join(lines)
+
+
+def run_profiled(sim, max_steps=None):
+    profile = sim.profile
+    mem = sim.memory
+    size = sim.MAX_MEM
+    base = sim._decode_base()
+    opcodes = profile.opcodes
+    executed = 0
+    sim.running = True
+    try:
+        while sim.running and (max_steps is None or executed < max_steps):
+            ip = sim.instruction_pointer
+            if 0 <= ip < size:
+                opcode, operand = divmod(abs(int(mem[ip])), base)
+            acc = sim.accumulator
+            sim.step()
+            executed += 1
+
+            opcodes[opcode] = opcodes.get(opcode, 0) + 1
+            profile.addresses[ip] += 1
+            profile.words[ip] = (opcode, operand)
+            if opcode in READS:
+                profile.reads[operand] += 1
+            elif opcode in WRITES:
+                profile.writes[operand] += 1
+            elif opcode == 40 or (opcode == 41 and acc < 0) or (opcode == 42 and acc == 0):
+                profile.taken[ip] += 1
+            elif opcode in (41, 42):
+                profile.not_taken[ip] += 1
+    finally:
+        profile.instructions += executed
+        if max_steps is not None:
+            sim.steps += executed
+    if max_steps is not None:
+        return executed
+    return None
@@ -0,0 +1,110 @@
+import time
+from collections import deque
+from uvsim import UVSim
+
+READY = "ready"
+BLOCKED = "blocked"
+HALTED = "halted"
+FAILED = "failed"
+EXHAUSTED = "exhausted"
+
+
+class _Blocked(Exception):
+    pass
+
+
+class Task:
+    def __init__(self, name, program, priority=1, budget=None, inputs=(), engine="decoded"):
+        self.name = name
+        self.priority = priority
+        self.budget = budget
+        self.inputs = deque(inputs)
+        self.outputs = []
+        self.state = READY
+        self.error = None
+        self.instructions = 0
+        self.cpu_time = 0.0
+        self.sim = UVSim(input_function=self._read, output_function=self.outputs.append, engine=engine)
+        self.sim.load(program)
+
+    def _read(self):
+        # Leaves the instruction pointer on the READ so the task resumes there.
+        if not self.inputs:
+            raise _Blocked()
+        return self.inputs.popleft()
+
+    def _slice(self, quantum):
+        slice_steps = quantum * self.priority
+        if self.budget is not None:
+            slice_steps = min(slice_steps, self.budget - self.instructions)
+        sim = self.sim
+        before = sim.steps
+        start = time.perf_counter()
+        try:
+            sim.run(max_steps=slice_steps)
+            if not sim.running:
+                self.state = HALTED
+        except _Blocked:
+            self.state = BLOCKED
+        except Exception as e:
+            self.state = FAILED
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.cpu_time += time.perf_counter() - start
+            self.instructions += sim.steps - before
+        if self.state == READY and self.budget is not None and self.instructions >= self.budget:
+            self.state = EXHAUSTED
+
+
+class Scheduler:
+    def __init__(self, quantum=1000):
+        self.quantum = quantum
+        self.tasks = {}
+
+    def add(self, name, program, priority=1, budget=None, inputs=(), engine="decoded"):
+        if name in self.tasks:
+            raise ValueError(f"Task already exists: {name}")
+        if priority < 1:
+            raise ValueError(f"Priority must be at least 1: {priority}")
+        task = Task(name, program, priority, budget, inputs, engine)
+        self.tasks[name] = task
+        return task
+
+    def send(self, name, *values):
+        task = self.tasks[name]
+        task.inputs.extend(values)
+        if task.state == BLOCKED:
+            task.state = READY
+
+    def ready(self):
+        return [task for task in self.tasks.values() if task.state == READY]
+
+    def round(self):
+        ready = self.ready()
+        for task in ready:
+            task._slice(self.quantum)
+        return len(ready)
+
+    def run(self, max_rounds=None):
+        rounds = 0
+        while self.ready() and (max_rounds is None or rounds < max_rounds):
+            self.round()
+            rounds += 1
+        return rounds
+
+    def report(self):
+        total_time = sum(task.cpu_time for task in self.tasks.values()) or 1.0
+        total_instructions = sum(task.instructions for task in self.tasks.values()) or 1
+        return [
+            {
+                "name": task.name,
+                "state": task.state,
+                "priority": task.priority,
+                "instructions": task.instructions,
+                "cpu_time": task.cpu_time,
+                "cpu_share": task.cpu_time / total_time,
+                "instruction_share": task.instructions / total_instructions,
+                "error": task.error,
+            }
+            for task in self.tasks.values()
+        ]
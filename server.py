@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from binary import Archive
+from batch import run_limited, DEFAULT_MAX_STEPS, DEFAULT_TIMEOUT
+from uvsim import UVSim
+
+# Newline-delimited JSON over a TCP or Unix socket. Each line is a request:
+#   {"id": ..., "program": ["+1007", ...] or "text", "image": base64 .uvb,
+#    "name": archive member, "inputs": [...], "max_steps": n, "timeout": s}
+# and gets one response line, in request order. Connections stay open for any
+# number of requests, and a client may send several before reading replies.
+PIPELINE_DEPTH = 64
+LINE_LIMIT = 1 << 20
+
+_sim = None
+_blank = None
+
+
+def _init_worker():
+    global _sim, _blank
+    _sim = UVSim(engine="decoded")
+    _blank = _sim.snapshot()
+
+
+def _ping():
+    return os.getpid()
+
+
+def execute(request, max_steps=DEFAULT_MAX_STEPS, timeout=DEFAULT_TIMEOUT):
+    start = time.perf_counter()
+    sim = _sim if _sim is not None else UVSim(engine="decoded")
+    if sim is _sim:
+        # Nothing from the worker's previous request may leak into this one:
+        # load() keeps the word format when given plain integers.
+        sim.restore(_blank)
+    outputs = []
+    response = {"id": request.get("id"), "outputs": outputs, "error": None, "halted": False,
+                "accumulator": 0, "instruction_pointer": 0, "instructions": 0}
+    try:
+        inputs = iter(request.get("inputs", []))
+
+        def read():
+            for value in inputs:
+                return int(value)
+            raise IndexError("No input remaining.")
+
+        sim.input_function, sim.output_function = read, outputs.append
+        if "image" in request:
+            archive = Archive("<request>", base64.b64decode(request["image"]))
+            archive.load(sim, request.get("name"))
+        else:
+            program = request["program"]
+            if isinstance(program, str):
+                program = program.splitlines()
+            sim.load([line.strip() if isinstance(line, str) else line
+                      for line in program if not isinstance(line, str) or line.strip()])
+        loaded = time.perf_counter()
+        response["load_time"] = loaded - start
+        try:
+            response["error"] = run_limited(sim, max_steps, timeout, loaded)
+        except (ValueError, IndexError, ZeroDivisionError, RuntimeError) as e:
+            response["error"] = f"{type(e).__name__}: {e}"
+        response["run_time"] = time.perf_counter() - loaded
+        response.update(halted=not sim.running and response["error"] is None, accumulator=sim.accumulator,
+                        instruction_pointer=sim.instruction_pointer, instructions=sim.steps)
+    except Exception as e:
+        response["error"] = f"{type(e).__name__}: {e}"
+    response["elapsed"] = time.perf_counter() - start
+    return response
+
+
+class Server:
+    def __init__(self, workers=None, max_steps=DEFAULT_MAX_STEPS, timeout=DEFAULT_TIMEOUT):
+        self.workers = workers or os.cpu_count()
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        self.server = None
+
+    def warm(self):
+        # Starts every worker now, so the first requests don't pay for spawning
+        # processes and importing uvsim.
+        wait([self.pool.submit(_ping) for _ in range(self.workers)])
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        await asyncio.get_running_loop().run_in_executor(None, self.warm)
+        if path:
+            self.server = await asyncio.start_unix_server(self._connection, path=path, limit=LINE_LIMIT)
+        else:
+            self.server = await asyncio.start_server(self._connection, host, port, limit=LINE_LIMIT)
+        return self.server
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.pool.shutdown(cancel_futures=True)
+
+    async def _dispatch(self, line):
+        request = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            if "program" not in request and "image" not in request:
+                raise ValueError("request needs 'program' or 'image'")
+            # Clients can lower the server's limits but not raise them.
+            max_steps = min(int(request.get("max_steps", self.max_steps)), self.max_steps)
+            timeout = min(float(request.get("timeout", self.timeout)), self.timeout)
+        except (ValueError, TypeError) as e:
+            return {"id": request.get("id") if isinstance(request, dict) else None, "error": f"BadRequest: {e}"}
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, execute, request, max_steps, timeout)
+
+    async def _connection(self, reader, writer):
+        pending = asyncio.Queue(PIPELINE_DEPTH)
+
+        async def respond():
+            while (task := await pending.get()) is not None:
+                writer.write((json.dumps(await task) + "\n").encode())
+                await writer.drain()
+
+        responder = asyncio.create_task(respond())
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    await pending.put(asyncio.ensure_future(self._dispatch(line)))
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            await pending.put(None)
+            try:
+                await responder
+            except ConnectionError:
+                pass
+            writer.close()
+
+
+async def serve(args):
+    server = Server(args.workers, args.max_steps, args.timeout)
+    try:
+        listener = await server.start(args.host, args.port, args.unix)
+        where = args.unix or "{}:{}".format(*listener.sockets[0].getsockname()[:2])
+        print(f"UVSim server listening on {where} with {server.workers} workers", file=sys.stderr)
+        await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="UVSim execution server (newline-delimited JSON)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-steps", type=int, default=DEFAULT_MAX_STEPS, help="instruction limit per request")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="wall-clock seconds per request")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args(sys.argv[1:])))
+    except KeyboardInterrupt:
+        pass
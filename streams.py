@@ -0,0 +1,94 @@
+import json
+import sys
+
+CHUNK = 1 << 16
+
+
+def read_values(source):
+    # Lazily yields the integers in a file ('-' for stdin), any whitespace
+    # apart. The file is opened right away, so a missing one fails here.
+    return _values(sys.stdin if source == "-" else open(source, "r"))
+
+
+def _values(f):
+    try:
+        for number, line in enumerate(f, 1):
+            for token in line.split():
+                try:
+                    yield int(token)
+                except ValueError:
+                    raise ValueError(f"Invalid input value on line {number}: '{token}'") from None
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def parse_values(text):
+    try:
+        return [int(token) for token in text.replace(",", " ").split()]
+    except ValueError as e:
+        raise ValueError(f"Invalid input list: {e}") from None
+
+
+class ValueReader:
+    # input_function that takes READ values from an iterable without prompting.
+    def __init__(self, values):
+        self._values = iter(values)
+        self.consumed = 0
+
+    def __call__(self):
+        for value in self._values:
+            self.consumed += 1
+            return value
+        raise IndexError("No input remaining.")
+
+
+class BufferedWriter:
+    # output_function that collects WRITE values and writes them in large
+    # chunks. In "json" mode nothing is written until close(), which emits one
+    # document with the outputs and the final VM state.
+    def __init__(self, out=sys.stdout, fmt="text", chunk=CHUNK):
+        self.out = out
+        self.format = fmt
+        self.chunk = chunk
+        self.values = []
+        self._pending = []
+        self._size = 0
+
+    def __call__(self, value):
+        if self.format == "json":
+            self.values.append(value)
+            return
+        text = f"{value}\n"
+        self._pending.append(text)
+        self._size += len(text)
+        if self._size >= self.chunk:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self.out.write("".join(self._pending))
+            self._pending.clear()
+            self._size = 0
+        self.out.flush()
+
+    def close(self, sim, error=None):
+        if self.format == "json":
+            self.out.write(json.dumps({
+                "outputs": self.values,
+                "error": error,
+                "halted": not sim.running and error is None,
+                "accumulator": sim.accumulator,
+                "instruction_pointer": sim.instruction_pointer,
+            }) + "\n")
+        elif error is not None:
+            self._pending.append(f"Runtime error: {error}\n")
+        self.flush()
+
+
+def prompting(read, writer):
+    # Wraps an interactive input_function so buffered output appears before each prompt.
+    def prompt():
+        writer.flush()
+        return read()
+    return prompt
@@ -0,0 +1,60 @@
+import pytest
+from uvsim import *
+from analysis import analyze
+
+def analyze_program(program):
+    sim = UVSim()
+    sim.load(program)
+    return analyze(sim)
+
+def steps_taken(program, inputs=()):
+    sim = UVSim(input_function=iter(inputs).__next__, output_function=lambda x: None)
+    sim.load(program)
+    return sim.run(max_steps=10**6)
+
+def test_straight_line_worst_case_matches_run():
+    with open("tests/Test1.txt") as f:
+        program = [line.strip() for line in f if line.strip()]
+    analysis = analyze_program(program)
+    assert analysis.errors == []
+    assert analysis.worst_case == steps_taken(program, [5, 7])
+
+def test_branches_take_longest_path():
+    program = ["+2005", "+4203", "+1105", "+4300", "+0000", "+0000"]
+    analysis = analyze_program(program)
+    assert analysis.worst_case == 4
+    assert steps_taken(program) == 3
+
+def test_counting_loop_worst_case_is_exact():
+    program = ["+020010", "+031011", "+021010", "+042005", "+040000", "+011010", "+043000",
+               "+000000", "+000000", "+000000", "+001000", "+000001"]
+    assert analyze_program(program).worst_case == steps_taken(program)
+
+def test_unknown_loop_has_no_worst_case():
+    program = ["+1010", "+2010", "+3111", "+2110", "+4206", "+4000", "+4300"]
+    analysis = analyze_program(program)
+    assert analysis.worst_case is None
+    assert analysis.infinite_loops == []
+    assert not analysis.non_terminating
+
+def test_detects_loop_that_never_halts():
+    analysis = analyze_program(["+2005", "+3006", "+4000", "+0000", "+0000", "+0004", "+0005"])
+    assert analysis.infinite_loops == [[0, 1, 2]]
+    assert analysis.non_terminating
+    assert "program can never halt" in analysis.errors
+
+def test_flags_bad_words_and_jumps_to_data():
+    analysis = analyze_program(["+2005", "+4005", "+4300", "+0000", "+0000", "+0004"])
+    assert analysis.jumps_to_data == [(1, 5)]
+    assert analysis.unreachable == [2]
+    assert analysis.errors == ["005: invalid opcode 0"]
+
+def test_flags_out_of_range_operand():
+    analysis = analyze_program(["+020300", "+043000"])
+    assert analysis.bad_operands == [0]
+    assert not analysis.non_terminating
+
+def test_self_modifying_code_is_not_estimated():
+    analysis = analyze_program(["+2004", "+2102", "+0000", "+4300", "+4300"])
+    assert analysis.self_modifying == [2]
+    assert analysis.worst_case is None
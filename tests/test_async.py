@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from uvsim import *
+from asyncsim import AsyncUVSim
+
+def load_file(file):
+    with open(f"tests/{file}", "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+@pytest.mark.parametrize("engine", ["interp", "decoded", "compiled"])
+def test_arun_with_async_io(engine):
+    inputs = [5, 7]
+    outputs = []
+
+    async def read():
+        await asyncio.sleep(0)
+        return inputs.pop(0)
+
+    async def write(value):
+        outputs.append(value)
+
+    sim = AsyncUVSim(input_function=read, output_function=write, engine=engine)
+    sim.load(load_file("Test1.txt"))
+    executed = asyncio.run(sim.arun())
+    assert outputs == [12]
+    assert sim.memory[7] == 5 and sim.memory[8] == 7
+    assert executed == 7
+
+def test_arun_accepts_sync_callables():
+    outputs = []
+    sim = AsyncUVSim(input_function=lambda: 9, output_function=outputs.append)
+    sim.load(["+1005", "+1105", "+4300"])
+    asyncio.run(sim.arun())
+    assert outputs == [9]
+
+def test_many_sessions_share_one_loop():
+    countdown = ["+2010", "+3111", "+2110", "+4205", "+4000", "+1110", "+4300",
+                 "+0000", "+0000", "+0000", "+2000", "+0001"]
+
+    async def main():
+        gate = asyncio.Event()
+        outputs = []
+
+        async def read():
+            await gate.wait()
+            return 1
+
+        waiting = AsyncUVSim(input_function=read, output_function=outputs.append)
+        waiting.load(["+1005", "+1105", "+4300"])
+        busy = [AsyncUVSim(output_function=outputs.append, yield_every=100) for _ in range(20)]
+        for sim in busy:
+            sim.load(countdown)
+        tasks = [asyncio.create_task(sim.arun()) for sim in [waiting] + busy]
+        await asyncio.gather(*tasks[1:])
+        assert not tasks[0].done()
+        gate.set()
+        await tasks[0]
+        return outputs
+
+    outputs = asyncio.run(main())
+    assert outputs == [0] * 20 + [1]
+
+def test_arun_stops_when_running_cleared():
+    async def main():
+        sim = AsyncUVSim(yield_every=50)
+        sim.load(["+4000"])
+        task = asyncio.create_task(sim.arun())
+        await asyncio.sleep(0.01)
+        sim.running = False
+        return await task
+
+    assert asyncio.run(main()) > 0
@@ -0,0 +1,62 @@
+import io
+import json
+import pytest
+from uvsim import *
+from batch import run_job, run_batch, memory_hash
+
+def test_run_job_test1():
+    result = run_job({"program": "tests/Test1.txt", "inputs": [5, 7]})
+    assert result["error"] is None
+    assert result["outputs"] == [12]
+    assert result["instructions"] == 7
+
+def test_run_job_step_limit(tmp_path):
+    program = tmp_path / "loop.txt"
+    # Spins at 00 forever, but the HALT after it keeps it past the static check.
+    program.write_text("+4200\n+4300\n")
+    result = run_job({"program": str(program), "inputs": []}, max_steps=25000)
+    assert result["error"].startswith("StepLimit")
+    assert result["instructions"] == 25000
+
+def test_run_job_timeout(tmp_path):
+    program = tmp_path / "loop.txt"
+    # Spins at 00 forever, but the HALT after it keeps it past the static check.
+    program.write_text("+4200\n+4300\n")
+    result = run_job({"program": str(program), "inputs": []}, max_steps=10**12, timeout=0.05)
+    assert result["error"].startswith("Timeout")
+
+def test_run_batch_directory(tmp_path):
+    (tmp_path / "a.txt").write_text(open("tests/Test1.txt").read())
+    (tmp_path / "a.in").write_text("5\n7\n")
+    (tmp_path / "b.txt").write_text("+9900\n")
+    out = io.StringIO()
+    failed = run_batch(str(tmp_path), jobs=2, out=out)
+    results = {r["program"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert failed == 1
+    assert results[str(tmp_path / "a.txt")]["outputs"] == [12]
+    assert results[str(tmp_path / "b.txt")]["error"] == "RuntimeError: Invalid opcode: 99"
+
+def test_memory_hash_matches_final_memory():
+    sim = UVSim(input_function=iter([5, 7]).__next__, output_function=lambda x: None)
+    with open("tests/Test1.txt") as f:
+        sim.load([line.strip() for line in f if line.strip()])
+    sim.run()
+    result = run_job({"program": "tests/Test1.txt", "inputs": [5, 7]})
+    assert result["memory_hash"] == memory_hash(sim.memory)
+
+def test_run_batch_rejects_programs_that_never_halt(tmp_path):
+    (tmp_path / "spin.txt").write_text("+2003\n+3004\n+4000\n+0000\n+0001\n")
+    out = io.StringIO()
+    failed = run_batch(str(tmp_path), jobs=1, out=out)
+    [result] = map(json.loads, out.getvalue().splitlines())
+    assert failed == 1
+    assert result["error"].startswith("NonTerminating")
+    assert result["instructions"] == 0
+    assert result["cached"] is False
+
+def test_run_job_screens_in_the_worker(tmp_path):
+    program = tmp_path / "spin.txt"
+    program.write_text("+4000\n")
+    result = run_job({"program": str(program), "inputs": []})
+    assert result["error"] == "NonTerminating: program can never halt (loop at 000)"
+    assert set(result) == set(run_job({"program": "tests/Test1.txt", "inputs": [5, 7]}))
@@ -0,0 +1,16 @@
+import pytest
+from uvsim import *
+from benchmarks.workloads import WORKLOADS
+
+@pytest.mark.parametrize("name", sorted(WORKLOADS))
+def test_workloads_halt_identically(name):
+    lines, inputs = WORKLOADS[name]()
+    states = []
+    for engine in ("interp", "decoded", "compiled"):
+        feed = iter(inputs)
+        sim = UVSim(input_function=lambda: next(feed), output_function=lambda value: None, engine=engine)
+        sim.load(lines)
+        executed = sim.run(max_steps=10**7)
+        assert not sim.running
+        states.append((executed, list(sim.memory), sim.accumulator))
+    assert states[0] == states[1] == states[2]
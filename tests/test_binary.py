@@ -0,0 +1,70 @@
+import io
+import json
+import pytest
+from array import array
+from uvsim import *
+from binary import Archive, write_archive, convert, load_file, is_binary
+from batch import run_batch
+
+TEST1 = [line.strip() for line in open("tests/Test1.txt") if line.strip()]
+
+def test_round_trip_matches_text_load(tmp_path):
+    path = tmp_path / "test1.uvb"
+    convert(["tests/Test1.txt"], str(path))
+    assert is_binary(str(path))
+
+    text = UVSim()
+    text.load(TEST1)
+    binary = UVSim()
+    load_file(binary, str(path))
+    assert binary.memory == text.memory
+    assert binary.format == text.format
+    assert binary.verified == text.verified
+
+def test_archive_holds_several_programs(tmp_path):
+    path = tmp_path / "many.uvb"
+    write_archive(str(path), [("add", TEST1), ("wide", ["+011003", "+043000", "", "-999999"])])
+    with Archive(str(path)) as archive:
+        assert list(archive) == ["add", "wide"]
+        sim = UVSim(output_function=lambda x: None)
+        archive.load(sim, "wide")
+        assert sim.format == 6 and sim.memory[3] == -999999
+        with pytest.raises(ValueError, match="holds 2 programs"):
+            archive.load(sim)
+
+def test_wide_program_round_trip(tmp_path):
+    program = ["+0109999", "+0119999", "+0430000"]
+    (tmp_path / "wide.txt").write_text("\n".join(program) + "\n")
+    path = tmp_path / "wide.uvb"
+    convert([str(tmp_path / "wide.txt")], str(path), memory_size=10000)
+    text = UVSim(memory_size=10000)
+    text.load(program)
+    binary = UVSim(memory_size=10000)
+    load_file(binary, str(path))
+    assert binary.format == text.format == 7
+    assert binary.memory == text.memory
+
+def test_checksum_detects_corruption(tmp_path):
+    path = tmp_path / "test1.uvb"
+    convert(["tests/Test1.txt"], str(path))
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 1
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        load_file(UVSim(), str(path))
+
+def test_load_words_checks_range():
+    sim = UVSim()
+    with pytest.raises(ValueError, match="4-digit range at line 2: 12345"):
+        sim.load_words(array("i", [4300, 12345]), 4)
+    with pytest.raises(IndexError):
+        sim.load_words(array("i", [0] * 251), 6)
+
+def test_batch_runs_archive_members(tmp_path):
+    write_archive(str(tmp_path / "progs.uvb"), [("add", TEST1), ("stop", ["+4300"])])
+    (tmp_path / "add.in").write_text("5\n7\n")
+    out = io.StringIO()
+    assert run_batch(str(tmp_path), jobs=1, out=out) == 0
+    results = {r["name"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert results["add"]["outputs"] == [12]
+    assert results["stop"]["instructions"] == 1
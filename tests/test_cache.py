@@ -0,0 +1,113 @@
+import io
+import json
+import os
+import pytest
+from uvsim import *
+from batch import run_job, run_batch
+from cache import ResultCache, result_key, run_cached
+from streams import ValueReader
+
+def load_test1(outputs, inputs):
+    sim = UVSim(input_function=iter(inputs).__next__, output_function=outputs.append)
+    with open("tests/Test1.txt") as f:
+        sim.load([line.strip() for line in f if line.strip()])
+    return sim
+
+def test_key_depends_on_image_format_and_inputs():
+    memory = [1007, 4300] + [0] * 248
+    key = result_key(memory, 4, [5, 7])
+    assert key == result_key(memory, 4, [5, 7])
+    assert key != result_key(memory, 6, [5, 7])
+    assert key != result_key(memory, 4, [5, 8])
+    assert key != result_key([1008, 4300] + [0] * 248, 4, [5, 7])
+
+def test_hit_skips_run_and_restores_state(monkeypatch):
+    cache = ResultCache()
+    first = []
+    sim = load_test1(first, [5, 7])
+    run_cached(sim, cache, inputs=[5, 7])
+    final_memory = sim.memory[:]
+
+    second = []
+    sim = load_test1(second, [])
+    monkeypatch.setattr(UVSim, "run", lambda self, max_steps=None: pytest.fail("run called on a cache hit"))
+    run_cached(sim, cache, inputs=[5, 7])
+    assert second == first == [12]
+    assert sim.memory == final_memory
+    assert cache.hits == 1
+
+def test_interactive_runs_reuse_only_runs_without_input():
+    cache = ResultCache()
+    outputs = []
+    sim = load_test1(outputs, [5, 7])
+    run_cached(sim, cache)
+    sim = load_test1(outputs, [1, 2])
+    run_cached(sim, cache)
+    assert outputs == [12, 3]
+    assert cache.hits == 0
+
+def test_interactive_run_ignores_run_that_ran_out_of_input():
+    cache = ResultCache()
+    sim = load_test1([], [])
+    sim.input_function = ValueReader([])
+    with pytest.raises(IndexError, match="No input remaining"):
+        run_cached(sim, cache, inputs=[])
+    outputs = []
+    sim = load_test1(outputs, [5, 7])
+    run_cached(sim, cache)
+    assert outputs == [12]
+    assert cache.hits == 0
+
+def test_errors_are_cached_and_reraised():
+    cache = ResultCache()
+    for _ in range(2):
+        sim = UVSim()
+        sim.load(["+9900"])
+        with pytest.raises(RuntimeError, match="Invalid opcode: 99"):
+            run_cached(sim, cache)
+    assert cache.hits == 1
+
+def test_memory_tier_is_lru():
+    cache = ResultCache(capacity=2)
+    cache.put("a", {"x": 1})
+    cache.put("b", {"x": 2})
+    cache.get("a")
+    cache.put("c", {"x": 3})
+    assert list(cache.entries) == ["a", "c"]
+
+def test_disk_tier_survives_and_is_bounded(tmp_path):
+    cache = ResultCache(directory=str(tmp_path), max_bytes=250)
+    for name in "abcd":
+        cache.put(name, {"outputs": [0] * 20})
+    files = sorted(os.listdir(tmp_path))
+    assert sum(os.path.getsize(tmp_path / f) for f in files) <= 250
+    assert "d.json" in files and "a.json" not in files
+    assert ResultCache(directory=str(tmp_path)).get("d") == {"outputs": [0] * 20}
+
+def test_run_job_uses_cache():
+    cache = ResultCache()
+    job = {"program": "tests/Test1.txt", "inputs": [5, 7]}
+    first = run_job(job, cache=cache)
+    second = run_job(job, cache=cache)
+    assert not first["cached"] and second["cached"]
+    for field in ("outputs", "memory_hash", "error", "instructions"):
+        assert first[field] == second[field]
+
+def test_run_job_does_not_cache_limits():
+    cache = ResultCache()
+    job = {"program": "tests/Test1.txt", "inputs": [5, 7]}
+    assert run_job(job, max_steps=3, cache=cache)["error"].startswith("StepLimit")
+    assert not run_job(job, cache=cache)["cached"]
+    assert run_job(job, max_steps=3, cache=cache)["error"].startswith("StepLimit")
+
+def test_run_batch_shares_disk_cache(tmp_path):
+    programs = tmp_path / "programs"
+    programs.mkdir()
+    (programs / "a.txt").write_text(open("tests/Test1.txt").read())
+    (programs / "a.in").write_text("5\n7\n")
+    for expect_cached in (False, True):
+        out = io.StringIO()
+        run_batch(str(programs), jobs=1, out=out, cache_dir=str(tmp_path / "cache"))
+        [result] = map(json.loads, out.getvalue().splitlines())
+        assert result["outputs"] == [12]
+        assert result["cached"] is expect_cached
@@ -0,0 +1,40 @@
+import io
+import json
+import pytest
+from uvsim import *
+from convert import convert_file, convert_tree
+
+def test_convert_word_matches_list_conversion():
+    tokens = ["+1007", "-0012", "12", "+4300", "9999", "-1", ""]
+    assert [convert_word_4_to_6(t) for t in tokens] == convert_4_to_6(tokens)
+    assert convert_4_to_6(["+1007", "-4205", "0099"]) == ["010007", "-042005", "000099"]
+
+def test_convert_word_rejects_bad_tokens():
+    with pytest.raises(ValueError, match="Not a valid 4-digit token: '123456'"):
+        convert_word_4_to_6("123456")
+
+def test_convert_file_streams_and_skips_blank_lines(tmp_path):
+    source = tmp_path / "prog.txt"
+    source.write_text("+1007\n\n+1108\n+4300\n")
+    result = convert_file(str(source), str(tmp_path / "out" / "prog.txt"))
+    assert result["error"] is None and result["lines"] == 3
+    assert (tmp_path / "out" / "prog.txt").read_text() == "010007\n011008\n043000\n"
+
+def test_convert_tree_reports_bad_files_and_continues(tmp_path):
+    source = tmp_path / "src"
+    (source / "nested").mkdir(parents=True)
+    (source / "good.txt").write_text(open("tests/Test1.txt").read())
+    (source / "nested" / "bad.txt").write_text("+1007\n+020010\n")
+    (source / "nested" / "ok.txt").write_text("+4300\n")
+    out = io.StringIO()
+    failed = convert_tree(str(source), str(tmp_path / "dst"), jobs=2, out=out)
+    results = {r["source"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert failed == 1
+    assert results[str(source / "nested" / "bad.txt")]["error"] == \
+        "ValueError: line 2: Not a valid 4-digit token: '+020010'"
+    assert not (tmp_path / "dst" / "nested" / "bad.txt").exists()
+    assert (tmp_path / "dst" / "nested" / "ok.txt").read_text() == "043000\n"
+
+    converted = UVSim(input_function=iter([5, 7]).__next__, output_function=lambda x: None)
+    converted.load(open(tmp_path / "dst" / "good.txt").read().split())
+    assert converted.format == 6
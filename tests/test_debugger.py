@@ -0,0 +1,60 @@
+import pytest
+from uvsim import *
+from debugger import Debugger, Hit, BREAKPOINT, WRITE, ACCUMULATOR
+
+# Reads n, then counts it down to zero, writing and storing each value.
+COUNTDOWN = ["+1020", "+2020", "+1120", "+3121", "+2120", "+4207", "+4001", "+4300",
+             "", "", "", "", "", "", "", "", "", "", "", "", "+0000", "+0001"]
+
+def make_sim(n=3):
+    outputs = []
+    sim = UVSim(input_function=lambda: n, output_function=outputs.append)
+    sim.load(COUNTDOWN)
+    sim.debugger = Debugger()
+    return sim, outputs
+
+def test_breakpoint_pauses_before_instruction_and_resumes():
+    sim, outputs = make_sim()
+    sim.debugger.break_at(2)
+    sim.run()
+    assert sim.debugger.hit == Hit(BREAKPOINT, 2, None)
+    assert sim.running and sim.instruction_pointer == 2 and outputs == []
+    sim.run()
+    assert sim.debugger.hit == Hit(BREAKPOINT, 2, None)
+    assert outputs == [3]
+    sim.debugger.clear()
+    sim.run()
+    assert outputs == [3, 2, 1] and not sim.running
+
+def test_write_watchpoint_pauses_after_store():
+    sim, outputs = make_sim()
+    sim.debugger.watch(20)
+    sim.run()
+    assert sim.debugger.hit == Hit(WRITE, 20, 3)
+    assert sim.instruction_pointer == 1
+    sim.run()
+    assert sim.debugger.hit == Hit(WRITE, 20, 2)
+    assert outputs == [3]
+
+def test_accumulator_condition():
+    sim, outputs = make_sim(5)
+    sim.debugger.watch_accumulator(lambda acc: acc == 2)
+    sim.run()
+    assert sim.debugger.hit == Hit(ACCUMULATOR, 3, 2)
+    assert outputs == [5, 4, 3]
+
+def test_budget_counts_steps_while_armed():
+    sim, _ = make_sim()
+    sim.debugger.break_at(7)
+    assert sim.run(max_steps=5) == 5
+    assert sim.debugger.hit is None
+    sim.run(max_steps=1000)
+    assert sim.debugger.hit == Hit(BREAKPOINT, 7, None)
+    assert sim.steps == 18
+
+def test_disarmed_debugger_uses_normal_engine(monkeypatch):
+    import debugger
+    sim, outputs = make_sim()
+    monkeypatch.setattr(debugger, "run_debug", lambda *a: pytest.fail("checked loop used"))
+    sim.run()
+    assert outputs == [3, 2, 1]
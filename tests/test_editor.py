@@ -0,0 +1,82 @@
+import random
+import pytest
+from uvsim import *
+from editor import EditorImage
+
+PROGRAM = "00: +1007\n01: +1008\n02: +2007\n03: +3008\n04: +2109\n05: +1109\n06: +4300\n"
+
+def loaded(instructions, memory_size=250):
+    sim = UVSim(memory_size=memory_size)
+    sim.load(instructions)
+    return sim
+
+def test_image_matches_load():
+    image = EditorImage()
+    image.sync(PROGRAM)
+    words, fmt = image.image()
+    sim = loaded(image.instructions())
+    assert fmt == sim.format == 4
+    assert list(words) == list(sim.memory[:len(words)])
+
+def test_edit_reparses_only_changed_lines():
+    image = EditorImage()
+    image.sync(PROGRAM)
+    assert image.sync(PROGRAM.replace("+3008", "+3108")) == range(3, 4)
+    assert image.words[3] == 3108
+    assert image.sync(PROGRAM.replace("+3008", "+3108")) == range(0)
+
+def test_inserting_a_line_shifts_later_words():
+    image = EditorImage()
+    image.sync(PROGRAM)
+    dirty = image.sync(PROGRAM.replace("02: +2007\n", "02: +2007\nxx: +2008\n"))
+    assert dirty == range(3, 4)
+    assert list(image.words[:5]) == [1007, 1008, 2007, 2008, 3008]
+    assert image.instructions()[3] == "+2008"
+
+def test_notes_and_blank_words_take_no_address():
+    image = EditorImage()
+    image.sync("start here\n00: +1005\n01:\n02: +4300\n")
+    assert list(image.words) == [1005, 4300]
+
+def test_malformed_word_reports_like_load():
+    image = EditorImage()
+    image.sync(PROGRAM.replace("+2109", "+21x9"))
+    assert image.errors == 1
+    with pytest.raises(ValueError, match=r"Malformed word at input line 5: '\+21x9'"):
+        image.image()
+    image.sync(PROGRAM)
+    assert image.errors == 0
+    assert image.image()[0][4] == 2109
+
+def test_mixed_formats_report_like_load():
+    image = EditorImage()
+    image.sync(PROGRAM.replace("+4300", "+043000"))
+    with pytest.raises(ValueError, match="Mixed 4-digit and 6-digit"):
+        image.image()
+
+def test_too_many_words_reports_like_load():
+    image = EditorImage(memory_size=3)
+    image.sync(PROGRAM)
+    with pytest.raises(IndexError, match="Max 3 lines"):
+        image.image()
+
+def test_random_edits_match_fresh_parse():
+    rng = random.Random(2450)
+    lines = PROGRAM.splitlines()
+    image = EditorImage()
+    for _ in range(300):
+        position = rng.randrange(len(lines) + 1)
+        action = rng.choice(("insert", "delete", "change"))
+        if action == "insert" or not lines:
+            lines.insert(position, f"{position:02d}: +{rng.randrange(10000):04d}")
+        elif action == "delete":
+            del lines[min(position, len(lines) - 1)]
+        else:
+            lines[min(position, len(lines) - 1)] = rng.choice(("note", "07: +12z4", f"07: -{rng.randrange(10000):04d}"))
+        image.sync("\n".join(lines))
+        fresh = EditorImage()
+        fresh.sync("\n".join(lines))
+        assert image.entries == fresh.entries
+        assert image.words == fresh.words
+        assert image.errors == fresh.errors
+        assert {k: v for k, v in image.formats.items() if v} == {k: v for k, v in fresh.formats.items() if v}
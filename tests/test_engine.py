@@ -0,0 +1,162 @@
+import pytest
+from uvsim import *
+import compiler
+
+ENGINES = ("interp", "decoded", "compiled")
+
+COUNTDOWN = ["+2010", "+3111", "+2110", "+4205", "+4000", "+4300",
+             "+0000", "+0000", "+0000", "+0000", "+0500", "+0001"]
+
+def run_all(program, inputs=()):
+    results = []
+    for engine in ENGINES:
+        queue = list(inputs)
+        outputs = []
+        sim = UVSim(input_function=lambda: queue.pop(0), output_function=outputs.append, engine=engine)
+        sim.load(program)
+        try:
+            sim.run()
+            error = None
+        except Exception as e:
+            error = (type(e), str(e))
+        results.append((list(sim.memory), sim.accumulator, sim.instruction_pointer, outputs, error))
+    return results
+
+def test_countdown_matches_interp():
+    interp, decoded, compiled = run_all(COUNTDOWN)
+    assert decoded == interp
+    assert compiled == interp
+    assert interp[0][10] == 0
+
+def test_io_matches_interp():
+    with open("tests/Test1.txt") as f:
+        program = [line.strip() for line in f if line.strip()]
+    interp, decoded, compiled = run_all(program, [5, 7])
+    assert decoded == interp
+    assert compiled == interp
+    assert interp[3] == [12]
+
+def test_self_modifying_store():
+    # 03 starts as an invalid opcode and is overwritten with HALT before it runs
+    program = ["+2005", "+2103", "+4003", "+9999", "+0000", "+4300"]
+    interp, decoded, compiled = run_all(program)
+    assert decoded == interp
+    assert compiled == interp
+    assert interp[4] is None
+
+def test_self_modifying_loop():
+    # the first pass rewrites the ADD at 02 into a SUBTRACT
+    program = ["+2010", "+4207", "+3011", "+2110", "+2012", "+2102", "+4000", "+4300",
+               "+0000", "+0000", "+0005", "+0005", "+3111"]
+    interp, decoded, compiled = run_all(program)
+    assert decoded == interp
+    assert compiled == interp
+    assert interp[0][2] == 3111
+    assert interp[0][10] == 0
+
+def test_errors_match_interp():
+    programs = [
+        ["+2001", "+3202"],
+        ["+9900"],
+        ["+020300", "+043000"],
+        ["+4099"],
+        ["+1005", "+4300"],
+    ]
+    for program in programs:
+        interp, decoded, compiled = run_all(program, [123456])
+        assert decoded == interp
+        assert compiled == interp
+        assert interp[4] is not None
+
+def test_compiled_program_is_cached():
+    compiler._cache.clear()
+    for _ in range(3):
+        sim = UVSim(engine="compiled")
+        sim.load(COUNTDOWN)
+        sim.run()
+        assert sim.memory[10] == 0
+    assert len(compiler._cache) == 1
+
+def test_max_steps_pauses_and_resumes():
+    for engine in ENGINES:
+        sim = UVSim(engine=engine)
+        sim.load(COUNTDOWN)
+        assert sim.run(max_steps=7) == 7
+        assert sim.running
+        while sim.running:
+            sim.run(max_steps=100)
+        assert sim.memory[10] == 0
+        assert sim.steps == 500 * 5
+
+def test_empty_or_negative_budget_runs_nothing():
+    for engine in ENGINES:
+        sim = UVSim(engine=engine)
+        sim.load(COUNTDOWN)
+        assert sim.run(max_steps=0) == 0
+        assert sim.run(max_steps=-1) == 0
+        assert sim.instruction_pointer == 0 and sim.steps == 0
+
+def test_verifier_marks_safe_programs():
+    sim = UVSim()
+    sim.load(COUNTDOWN)
+    assert sim.verified
+    assert sim.mutable == {10}
+    assert sim.reachable == {0, 1, 2, 3, 4, 5}
+
+def test_verifier_rejects_unsafe_programs():
+    unsafe = [
+        ["+2005", "+2103", "+4003", "+9999", "+0000", "+4300"],  # writes into code
+        ["+2005", "+3005"],                                      # falls into an empty word
+        ["+020300", "+043000"],                                  # operand out of range
+        ["+9900"],                                               # invalid opcode
+    ]
+    for program in unsafe:
+        sim = UVSim()
+        sim.load(program)
+        assert not sim.verified
+
+def test_fused_idiom_is_undone_when_overwritten():
+    # 00-02 LOAD/ADD/STORE is fused; the first pass turns the ADD into SUBTRACT
+    program = ["+2020", "+3021", "+2120", "+2022", "+2101", "+2020", "+4208", "+4000", "+4300",
+               "+0000", "+0000", "+0000", "+0000", "+0000", "+0000", "+0000", "+0000", "+0000",
+               "+0000", "+0000", "+0005", "+0005", "+3121"]
+    interp, decoded, compiled = run_all(program)
+    assert decoded == interp
+    assert compiled == interp
+    assert interp[0][1] == 3121
+    assert interp[0][20] == 0
+
+def test_fused_branch_idioms():
+    # LOAD/SUBTRACT/BRANCHNEG and LOAD/BRANCHZERO drive a countdown that writes each value
+    program = ["+2010", "+3111", "+4106", "+2110", "+1110", "+4000", "+2010", "+4208", "+4300",
+               "+4300", "+0003", "+0001"]
+    interp, decoded, compiled = run_all(program)
+    assert decoded == interp
+    assert compiled == interp
+    assert interp[3] == [2, 1, 0]
+
+@pytest.mark.parametrize("slice_size", [1, 2, 3, 5])
+def test_fused_idioms_count_every_step_under_a_budget(slice_size):
+    program = ["+2010", "+3111", "+4106", "+2110", "+1110", "+4000", "+2010", "+4208", "+4300",
+               "+4300", "+0003", "+0001"]
+    runs = []
+    for engine in ("interp", "decoded"):
+        states = []
+        sim = UVSim(output_function=lambda x: None, engine=engine)
+        sim.load(program)
+        while True:
+            executed = sim.run(max_steps=slice_size)
+            states.append((executed, list(sim.memory), sim.accumulator, sim.instruction_pointer))
+            if not sim.running:
+                break
+        runs.append((states, sim.steps))
+    assert runs[1] == runs[0]
+
+def test_writing_code_after_load_drops_verification():
+    sim = UVSim()
+    sim.load(["+020005", "+043000"])
+    assert sim.verified
+    sim.set_memory(0, 20999)
+    assert not sim.verified
+    with pytest.raises(IndexError, match=r"Invalid operand address 999 for 6-digit program \(must be 000-249\)\."):
+        sim.run()
@@ -16,3 +16,23 @@ def test_store():
   sim.run()
 
   assert sim.memory[1] == 456
+
+def test_snapshot_restore():
+  sim = UVSim(input_function = lambda: 5, output_function = lambda x: None)
+  sim.load(["+1007", "+2007", "+3007", "+2108", "+4300"])
+  image = sim.snapshot()
+  sim.run()
+  assert sim.memory[8] == 10
+
+  sim.restore(image)
+  assert sim.memory[7] == 0 and sim.memory[8] == 0
+  assert sim.accumulator == 0 and sim.instruction_pointer == 0
+  sim.run()
+  assert sim.memory[8] == 10
+
+def test_snapshot_is_a_copy():
+  sim = UVSim()
+  sim.load(["+4300"])
+  image = sim.snapshot()
+  sim.memory[5] = 42
+  assert image[0][5] == 0
@@ -0,0 +1,92 @@
+import pytest
+from uvsim import *
+from loops import match_counting_loop, solve
+
+def truncate(value, modulus):
+    return -(-value % modulus) if value < 0 else value % modulus
+
+def brute_force(x, d, exit_opcode, modulus, limit=1000):
+    for n in range(1, limit):
+        x = truncate(x + d, modulus)
+        if (exit_opcode == 42 and x == 0) or (exit_opcode == 41 and x < 0):
+            return n, x
+    return None
+
+@pytest.mark.parametrize("modulus", [10, 12, 36])
+def test_solve_matches_brute_force(modulus):
+    for x in range(-modulus + 1, modulus):
+        for d in range(-modulus + 1, modulus):
+            for exit_opcode in (41, 42):
+                found = solve(x, d, exit_opcode, modulus)
+                if found is not None:
+                    assert found == brute_force(x, d, exit_opcode, modulus)
+                elif exit_opcode == 42:
+                    assert brute_force(x, d, exit_opcode, modulus) is None
+
+def test_match_counting_loop_shapes():
+    bottom = [(20, 10), (31, 11), (21, 10), (42, 6), (40, 0)]
+    top = [(20, 10), (41, 6), (30, 11), (21, 10), (40, 0)]
+    assert match_counting_loop(bottom, 0) == (10, 11, -1, 42, 6, False)
+    assert match_counting_loop(top, 0) == (10, 11, 1, 41, 6, True)
+    assert match_counting_loop([(20, 10), (31, 11), (21, 12), (42, 6), (40, 0)], 0) is None
+    assert match_counting_loop([(20, 10), (31, 11), (21, 10), (42, 6), (40, 1)], 0) is None
+    assert match_counting_loop([(20, 3), (31, 11), (21, 3), (42, 6), (40, 0)], 0) is None
+
+def test_decoded_fast_forwards_six_digit_countdown():
+    # 999999 iterations of LOAD/SUBTRACT/STORE/BRANCHZERO/BRANCH, then WRITE
+    program = ["+020010", "+031011", "+021010", "+042005", "+040000", "+011010", "+043000",
+               "+000000", "+000000", "+000000", "+999999", "+000001"]
+    outputs = []
+    sim = UVSim(output_function=outputs.append, engine="decoded")
+    sim.load(program)
+    sim.run()
+    assert outputs == [0]
+    assert sim.memory[10] == 0 and sim.accumulator == 0
+    assert sim.instruction_pointer == 6
+
+def test_decoded_counting_loop_with_wraparound_matches_interp():
+    # counts up by 7 from -20 until the counter wraps back onto exactly zero
+    program = ["+2010", "+4206", "+3011", "+2110", "+4000", "+4300", "+1110", "+4300",
+               "+0000", "+0000", "-0020", "+0007"]
+    states = []
+    for engine in ("interp", "decoded"):
+        outputs = []
+        sim = UVSim(output_function=outputs.append, engine=engine)
+        sim.load(program)
+        sim.run()
+        states.append((list(sim.memory), sim.accumulator, sim.instruction_pointer, outputs))
+    assert states[0] == states[1]
+
+def test_decoded_counting_loop_charges_its_steps_to_the_budget():
+    program = ["+020010", "+031011", "+021010", "+042005", "+040000", "+011010", "+043000",
+               "+000000", "+000000", "+000000", "+001000", "+000001"]
+    counts = []
+    for engine in ("interp", "decoded"):
+        sim = UVSim(output_function=lambda x: None, engine=engine)
+        sim.load(program)
+        assert sim.run(max_steps=4995) == 4995
+        assert sim.memory[10] == 1
+        sim.run(max_steps=10**6)
+        counts.append((sim.steps, sim.memory[10], sim.instruction_pointer))
+        sim.load(program)
+        sim.run(max_steps=10**6)
+        counts.append((sim.steps, sim.memory[10], sim.instruction_pointer))
+    assert counts[:2] == counts[2:] == [(1000 * 5 - 1 + 2, 0, 6)] * 2
+
+@pytest.mark.parametrize("slice_size", [7, 100, 10_000])
+def test_decoded_counting_loop_in_slices_matches_interp(slice_size):
+    # top-tested count up from -20 by 7 until zero, and a 6-digit countdown
+    for program in (["+2010", "+4206", "+3011", "+2110", "+4000", "+4300", "+1110", "+4300",
+                     "+0000", "+0000", "-0020", "+0007"],
+                    ["+020010", "+031011", "+021010", "+042005", "+040000", "+011010", "+043000",
+                     "+000000", "+000000", "+000000", "+002345", "+000001"]):
+        runs = []
+        for engine in ("interp", "decoded"):
+            states = []
+            sim = UVSim(output_function=lambda x: None, engine=engine)
+            sim.load(program)
+            while sim.running or not states:
+                sim.run(max_steps=slice_size)
+                states.append((sim.steps, sim.memory[10], sim.accumulator, sim.instruction_pointer))
+            runs.append(states)
+        assert runs[0] == runs[1]
@@ -0,0 +1,97 @@
+import pytest
+from array import array
+from uvsim import *
+from memory import PagedMemory, make_memory, word_digits, PAGE_SIZE
+
+def test_paged_memory_reads_zero_until_written():
+    mem = PagedMemory(10**6)
+    assert len(mem) == 10**6
+    assert mem[123456] == 0
+    mem[5] = 0
+    assert mem.allocated == 0
+    mem[999999] = -7
+    assert mem[999999] == -7
+    assert mem[-1] == -7
+    assert mem.allocated == PAGE_SIZE
+    with pytest.raises(IndexError):
+        mem[10**6]
+
+def test_paged_memory_copies_and_compares_like_array():
+    mem = PagedMemory(5000)
+    mem[:3] = [1, 2, 3]
+    mem[4999] = 9
+    copy = mem[:]
+    copy[0] = 100
+    assert mem[0] == 1
+    assert list(mem)[:4] == [1, 2, 3, 0]
+    dense = array("i", mem)
+    assert mem == dense
+    mem[:] = copy
+    assert mem[0] == 100 and mem[4999] == 9
+
+def test_memory_kind_follows_size():
+    assert isinstance(make_memory(250), array)
+    assert isinstance(make_memory(10**6), PagedMemory)
+    assert isinstance(make_memory(250, "paged"), PagedMemory)
+    with pytest.raises(ValueError):
+        make_memory(0)
+
+def test_word_digits_grow_with_memory():
+    assert word_digits(250) == 6
+    assert word_digits(1000) == 6
+    assert word_digits(10000) == 7
+    assert word_digits(10**6) == 9
+
+@pytest.mark.parametrize("engine", ["interp", "decoded", "compiled"])
+@pytest.mark.parametrize("kind", ["dense", "paged"])
+def test_wide_program_uses_high_addresses(engine, kind):
+    outputs = []
+    sim = UVSim(input_function=lambda: 42, output_function=outputs.append,
+                engine=engine, memory_size=10000, memory_kind=kind)
+    sim.load(["+0109999", "+0209999", "+0300006", "+0219998", "+0119998", "+0430000", "+0000001"])
+    assert sim.format == 7
+    sim.run()
+    assert outputs == [43]
+    assert sim.memory[9998] == 43
+
+def test_sparse_machine_allocates_touched_pages_only():
+    sim = UVSim(input_function=lambda: -5, output_function=lambda x: None, memory_size=10**6)
+    sim.load(["+010999999", "+011999999", "+043000000"])
+    sim.run()
+    assert sim.memory[999999] == -5
+    assert sim.memory.allocated == 2 * PAGE_SIZE
+
+@pytest.mark.parametrize("engine", ["interp", "decoded", "compiled"])
+def test_operand_limit_follows_memory_size(engine):
+    sim = UVSim(engine=engine, memory_size=300)
+    sim.load(["+040300", "+043000"])
+    with pytest.raises(IndexError, match="must be 000-299"):
+        sim.run()
+    for program, address in ((["+3055"], 55), (["+4082"], 82)):
+        sim = UVSim(engine=engine, memory_size=50)
+        sim.load(program)
+        with pytest.raises(IndexError, match=f"Invalid memory address: {address}$"):
+            sim.run()
+
+def test_default_machine_keeps_6_digit_limit():
+    sim = UVSim()
+    sim.load(["+040250", "+043000"])
+    with pytest.raises(IndexError, match=r"Invalid operand address 250 for 6-digit program \(must be 000-249\)\."):
+        sim.run()
+    with pytest.raises(ValueError):
+        sim.load(["+0430000"])
+
+def test_decoded_tables_survive_slices_until_memory_changes():
+    sim = UVSim(engine="decoded", memory_size=65536)
+    sim.load(["+2010", "+3111", "+2110", "+4205", "+4000", "+4300",
+              "+0000", "+0000", "+0000", "+0000", "+0050", "+0001"])
+    sim.run(max_steps=10)
+    tables = sim.decoded[3]
+    sim.run(max_steps=10)
+    assert sim.decoded[3] is tables
+    sim.set_memory(11, 2)
+    sim.run(max_steps=10)
+    assert sim.decoded[3] is not tables
+    while sim.running:
+        sim.run(max_steps=10)
+    assert sim.memory[10] == 0
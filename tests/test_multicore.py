@@ -0,0 +1,82 @@
+import re
+import pytest
+from array import array
+from uvsim import *
+from multicore import CPU, Multicore, run_machine, FETCH_ADD, TEST_AND_SET
+
+# Each CPU takes a spinlock with TEST_AND_SET, does a plain (non-atomic)
+# increment of the counter at 31, releases the lock, then takes a ticket with
+# FETCH_ADD until the tickets run out. Every ticket is one locked increment.
+SPINLOCK = ["+4530", "+4203", "+4000", "+2031", "+3032", "+2131", "+2033", "+2130",
+            "+2032", "+4435", "+3136", "+4100", "+4300"] + ["+0000"] * 17 + \
+           ["+0000", "+0000", "+0001", "+0000", "+0000", "+0000", "+0300"]
+
+def cpu_for(program, index=0, inputs=()):
+    sim = UVSim()
+    sim.load(program)
+    return CPU(array("i", sim.memory), sim.format, index, input_function=iter(inputs).__next__,
+               output_function=lambda x: None)
+
+def test_atomics_update_memory_and_return_old_value():
+    cpu = cpu_for(["+2010", f"+{FETCH_ADD}11", f"+{TEST_AND_SET}12", "+4300"] + ["+0000"] * 6 + ["+0005", "+0007", "+0000"])
+    cpu.run()
+    assert cpu.memory[11] == 12
+    assert cpu.memory[12] == 1
+    assert cpu.accumulator == 0
+
+def test_cpu_starts_with_its_index_in_the_accumulator():
+    cpu = cpu_for(["+2105", "+4300"], index=3)
+    cpu.run()
+    assert cpu.memory[5] == 3
+
+@pytest.mark.parametrize("program", [
+    ["+2050", "+9900"],
+    ["+040300", "+043000"],
+    ["+2005", "+3206", "+4300", "+0000", "+0000", "+0000", "+0000"],
+])
+def test_cpu_errors_match_interpreter(program):
+    sim = UVSim()
+    sim.load(program)
+    with pytest.raises(Exception) as expected:
+        sim.run()
+    with pytest.raises(expected.type, match=re.escape(str(expected.value))):
+        cpu_for(program).run()
+
+def test_spinlock_counts_every_ticket():
+    with Multicore(3) as machine:
+        machine.load(SPINLOCK)
+        results = machine.run()
+        memory = machine.memory
+    assert [r["error"] for r in results] == [None] * 3
+    assert all(r["halted"] for r in results)
+    assert memory[31] == memory[35] == 300 + 3
+    assert memory[30] == 0
+
+def test_cpus_report_errors_separately():
+    # CPU 0 halts at 00; CPU 1 starts at 01 and hits an invalid opcode.
+    with Multicore(2) as machine:
+        machine.load(["+4300", "+9900"])
+        results = machine.run(entries=[0, 1])
+    assert results[0]["error"] is None
+    assert results[1]["error"] == "RuntimeError: Invalid opcode: 99"
+
+def test_cpu_with_no_budget_left_runs_nothing():
+    cpu = cpu_for(["+4000"])
+    assert cpu.run(max_steps=-1) == 0
+    assert cpu.steps == 0
+
+def test_step_limit_stops_spinning_cpu():
+    with Multicore(1) as machine:
+        machine.load(["+4000"])
+        [result] = machine.run(max_steps=5000)
+    assert result["error"].startswith("StepLimit")
+    assert result["instructions"] == 5000
+
+def test_run_machine_writes_json_lines():
+    import io, json
+    sim = UVSim()
+    sim.load(["+1005", "+1105", "+4300"])
+    out = io.StringIO()
+    assert run_machine(sim, 2, [[4], [9]], out=out) == 0
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["outputs"] for r in results] == [[4], [9]]
@@ -0,0 +1,41 @@
+import pytest
+from uvsim import *
+from profiler import Profile
+
+COUNTDOWN = ["+2010", "+3111", "+2110", "+4205", "+4000", "+1110", "+4300",
+             "+0000", "+0000", "+0000", "+0050", "+0001"]
+
+def profiled_run(program):
+    outputs = []
+    sim = UVSim(output_function=outputs.append)
+    sim.load(program)
+    sim.profile = Profile()
+    sim.run()
+    return sim, outputs
+
+def test_profile_counts():
+    sim, outputs = profiled_run(COUNTDOWN)
+    profile = sim.profile
+    assert outputs == [0]
+    assert profile.instructions == 251
+    assert profile.opcodes[20] == 50
+    assert profile.addresses[4] == 49
+    assert profile.taken[3] == 1 and profile.not_taken[3] == 49
+    assert profile.reads[10] == 51 and profile.writes[10] == 50
+
+def test_profile_matches_unprofiled_run():
+    sim, _ = profiled_run(COUNTDOWN)
+    plain = UVSim(output_function=lambda x: None)
+    plain.load(COUNTDOWN)
+    plain.run()
+    assert list(sim.memory) == list(plain.memory)
+    assert sim.accumulator == plain.accumulator
+
+def test_profile_report_and_json(tmp_path):
+    sim, _ = profiled_run(COUNTDOWN)
+    report = sim.profile.report(top=3)
+    assert "BRANCHZERO" in report
+    assert "taken 1, not taken 49" in report
+    path = tmp_path / "profile.json"
+    sim.profile.save(path)
+    assert '"instructions": 251' in path.read_text()
@@ -0,0 +1,48 @@
+import pytest
+from uvsim import *
+from scheduler import Scheduler
+
+LOOP = ["+4000"]
+ECHO = ["+1010", "+1110", "+4300"]
+COUNTDOWN = ["+2010", "+3111", "+2110", "+4205", "+4000", "+1110", "+4300",
+             "+0000", "+0000", "+0000", "+0300", "+0001"]
+
+def test_infinite_loop_does_not_starve_others():
+    sched = Scheduler(quantum=100)
+    sched.add("spin", LOOP, budget=50000)
+    done = sched.add("count", COUNTDOWN)
+    sched.run(max_rounds=20)
+    assert done.state == "halted"
+    assert done.outputs == [0]
+    assert sched.tasks["spin"].state == "ready"
+
+def test_blocked_task_is_parked_until_input():
+    sched = Scheduler(quantum=10)
+    echo = sched.add("echo", ECHO)
+    sched.add("count", COUNTDOWN)
+    sched.run()
+    assert echo.state == "blocked"
+    assert echo.instructions == 0
+    sched.send("echo", 42)
+    sched.run()
+    assert echo.state == "halted"
+    assert echo.outputs == [42]
+
+def test_priority_and_budget():
+    sched = Scheduler(quantum=100)
+    low = sched.add("low", LOOP, priority=1, budget=3000)
+    high = sched.add("high", LOOP, priority=3, budget=9000)
+    sched.run(max_rounds=10)
+    assert high.instructions == 3 * low.instructions
+    sched.run()
+    assert low.state == high.state == "exhausted"
+    assert (low.instructions, high.instructions) == (3000, 9000)
+    shares = {row["name"]: row["instruction_share"] for row in sched.report()}
+    assert shares["high"] == pytest.approx(0.75)
+
+def test_failed_task_reports_error():
+    sched = Scheduler()
+    task = sched.add("bad", ["+9900"])
+    sched.run()
+    assert task.state == "failed"
+    assert task.error == "RuntimeError: Invalid opcode: 99"
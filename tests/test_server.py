@@ -0,0 +1,62 @@
+import asyncio
+import base64
+import json
+import pytest
+from binary import pack, encode
+import server
+from server import Server, execute
+
+TEST1 = [line.strip() for line in open("tests/Test1.txt") if line.strip()]
+
+def test_execute_reports_state_and_timings():
+    response = execute({"id": 1, "program": "\n".join(TEST1), "inputs": [5, 7]})
+    assert response["outputs"] == [12] and response["error"] is None and response["halted"]
+    assert response["instructions"] == 7 and response["accumulator"] == 12
+    assert response["elapsed"] >= response["run_time"] >= 0
+
+def test_execute_binary_image_and_limits():
+    image = base64.b64encode(pack("loop", *encode(["+4000"]))).decode()
+    response = execute({"image": image}, max_steps=50)
+    assert response["error"] == "StepLimit: exceeded 50 instructions"
+    assert response["instructions"] == 50
+
+def test_worker_vm_does_not_carry_format_between_requests(monkeypatch):
+    monkeypatch.setattr(server, "_sim", None)
+    server._init_worker()
+    # Integer words default to 6-digit format, so 1007 decodes as opcode 1.
+    fresh = execute({"program": [1007, 4300]})
+    execute({"program": TEST1, "inputs": [5, 7]})
+    again = execute({"program": [1007, 4300]})
+    assert fresh["error"] == again["error"] == "RuntimeError: Invalid opcode: 1"
+
+def test_pipelined_requests_on_one_connection():
+    async def session():
+        server = Server(workers=2, max_steps=1000)
+        try:
+            listener = await server.start(port=0)
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            requests = [
+                {"id": "slow", "program": ["+4000"], "max_steps": 10**9},
+                {"id": "add", "program": TEST1, "inputs": [5, 7]},
+                "not json",
+                {"id": "empty"},
+            ]
+            for request in requests:
+                line = request if isinstance(request, str) else json.dumps(request)
+                writer.write(line.encode() + b"\n")
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in requests]
+            writer.write(json.dumps({"id": "again", "program": TEST1, "inputs": [1, 2]}).encode() + b"\n")
+            responses.append(json.loads(await reader.readline()))
+            writer.close()
+            return responses
+        finally:
+            server.close()
+
+    slow, add, bad, empty, again = asyncio.run(session())
+    assert slow["id"] == "slow" and slow["error"] == "StepLimit: exceeded 1000 instructions"
+    assert add["id"] == "add" and add["outputs"] == [12]
+    assert bad["error"].startswith("BadRequest")
+    assert empty["id"] == "empty" and empty["error"].startswith("BadRequest")
+    assert again["outputs"] == [3]
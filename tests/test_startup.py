@@ -0,0 +1,13 @@
+import subprocess
+import sys
+import pytest
+
+def test_headless_import_skips_gui():
+    probe = "import sys, main; print(sorted(m for m in ('tkinter', 'gui', 'batch', 'compiler') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+def test_cli_runs_program():
+    out = subprocess.run([sys.executable, "main.py", "tests/Test1.txt"], input="5\n7\n",
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.strip().endswith("12")
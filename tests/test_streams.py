@@ -0,0 +1,65 @@
+import io
+import json
+import subprocess
+import sys
+import pytest
+from uvsim import *
+from streams import BufferedWriter, ValueReader, parse_values, read_values
+
+def test_value_reader_and_sources(tmp_path):
+    path = tmp_path / "in.txt"
+    path.write_text("5 7\n\n-3\n")
+    assert list(read_values(str(path))) == [5, 7, -3]
+    assert parse_values("5, 7,-3") == [5, 7, -3]
+    read = ValueReader([1])
+    assert read() == 1 and read.consumed == 1
+    with pytest.raises(IndexError, match="No input remaining"):
+        read()
+
+def test_bad_input_file_reports_line(tmp_path):
+    path = tmp_path / "in.txt"
+    path.write_text("5\nseven\n")
+    with pytest.raises(ValueError, match="line 2: 'seven'"):
+        list(read_values(str(path)))
+
+def test_writer_buffers_until_chunk_or_close():
+    out = io.StringIO()
+    writer = BufferedWriter(out, chunk=8)
+    writer(1)
+    writer(22)
+    assert out.getvalue() == ""
+    writer(333)
+    assert out.getvalue() == "1\n22\n333\n"
+    writer(4)
+    writer.close(UVSim())
+    assert out.getvalue().endswith("333\n4\n")
+
+def test_json_writer_reports_final_state():
+    out = io.StringIO()
+    writer = BufferedWriter(out, fmt="json")
+    sim = UVSim(input_function=ValueReader([5, 7]), output_function=writer)
+    with open("tests/Test1.txt") as f:
+        sim.load([line.strip() for line in f if line.strip()])
+    sim.run()
+    writer.close(sim)
+    assert json.loads(out.getvalue()) == {"outputs": [12], "error": None, "halted": True,
+                                          "accumulator": 12, "instruction_pointer": 6}
+
+def test_cli_reads_piped_input_without_prompting():
+    result = subprocess.run([sys.executable, "main.py", "tests/Test1.txt", "--input", "-", "--output-format", "json"],
+                            input="5 7\n", capture_output=True, text=True)
+    assert result.returncode == 0
+    assert json.loads(result.stdout)["outputs"] == [12]
+
+def test_cli_reports_exhausted_input():
+    result = subprocess.run([sys.executable, "main.py", "tests/Test1.txt", "--inputs", "5"],
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+    assert result.stdout == "Runtime error: No input remaining.\n"
+
+def test_cli_rejects_missing_input_file(tmp_path):
+    result = subprocess.run([sys.executable, "main.py", "tests/Test1.txt", "--input", str(tmp_path / "missing.txt")],
+                            capture_output=True, text=True)
+    assert result.returncode == 2
+    assert result.stdout == ""
+    assert result.stderr.startswith("Cannot read input file:")
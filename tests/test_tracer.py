@@ -0,0 +1,86 @@
+import pytest
+from uvsim import *
+from tracer import Trace, RECORD
+
+# Reads n, then counts it down to zero, writing and storing each value.
+COUNTDOWN = ["+1020", "+2020", "+1120", "+3121", "+2120", "+4207", "+4001", "+4300",
+             "", "", "", "", "", "", "", "", "", "", "", "", "+0000", "+0001"]
+
+def reference_states(n, steps):
+    states = []
+    for count in range(steps + 1):
+        sim = UVSim(input_function=lambda: n, output_function=lambda x: None)
+        sim.load(COUNTDOWN)
+        sim.run(max_steps=count)
+        states.append((sim.memory[:], sim.accumulator, sim.instruction_pointer))
+    return states
+
+def traced(n, capacity=1000, snapshot_every=7):
+    outputs = []
+    sim = UVSim(input_function=lambda: n, output_function=outputs.append)
+    sim.load(COUNTDOWN)
+    sim.trace = Trace(capacity, snapshot_every)
+    sim.run()
+    return sim, outputs
+
+def state(sim):
+    return (sim.memory[:], sim.accumulator, sim.instruction_pointer)
+
+def test_records_every_step():
+    sim, outputs = traced(3)
+    trace = sim.trace
+    assert outputs == [3, 2, 1]
+    assert len(trace) == trace.total == 1 + 6 * 3 - 1 + 1
+    assert len(trace.buffer) == 1000 * RECORD.size
+    first = trace[0]
+    assert (first.ip, first.opcode, first.operand, first.address, first.new) == (0, 10, 20, 20, 3)
+    assert [r.opcode for r in trace.replay(1, 7)] == [20, 11, 31, 21, 42, 40]
+
+def test_jump_and_reverse_step_match_real_execution():
+    sim, _ = traced(4)
+    total = sim.trace.total
+    expected = reference_states(4, total)
+    for step in (total, 0, 13, 5, 20, total - 1, 6):
+        sim.trace.jump(sim, step)
+        assert state(sim) == expected[step]
+    sim.trace.jump(sim, total)
+    for step in range(total - 1, -1, -1):
+        sim.trace.step_back(sim)
+        assert state(sim) == expected[step]
+    sim.trace.step_forward(sim, 10)
+    assert state(sim) == expected[10]
+
+def test_ring_buffer_keeps_only_recent_steps():
+    sim, _ = traced(50, capacity=40, snapshot_every=16)
+    trace = sim.trace
+    expected = reference_states(50, trace.total)
+    assert len(trace) == 40
+    assert all(s[0] >= trace.first - 16 for s in trace.snapshots)
+    with pytest.raises(IndexError):
+        trace[trace.first - 1]
+    with pytest.raises(IndexError):
+        trace.jump(sim, trace.first - 1)
+    trace.jump(sim, trace.first)
+    assert state(sim) == expected[trace.first]
+
+def test_running_after_rewind_discards_undone_steps():
+    sim, outputs = traced(2)
+    total = sim.trace.total
+    sim.trace.jump(sim, 3)
+    sim.run()
+    assert sim.trace.total == total
+    assert outputs == [2, 1, 1]
+    assert state(sim) == reference_states(2, total)[total]
+
+def test_rewind_after_wrap_keeps_overwritten_steps_out_of_reach():
+    sim, _ = traced(50, capacity=100, snapshot_every=16)
+    trace = sim.trace
+    expected = reference_states(50, trace.total)
+    first = trace.first
+    trace.jump(sim, first + 10)
+    sim.run(max_steps=1)
+    assert trace.first == first
+    with pytest.raises(IndexError):
+        trace.jump(sim, first - 1)
+    trace.jump(sim, first)
+    assert state(sim) == expected[first]
@@ -0,0 +1,59 @@
+import pytest
+from uvsim import *
+
+np = pytest.importorskip("numpy")
+from vector import run_batch
+
+def load_file(file):
+    with open(f"tests/{file}", "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def run_single(program, inputs):
+    queue = list(inputs)
+    outputs = []
+    def read():
+        if not queue:
+            raise IndexError("No input remaining.")
+        return queue.pop(0)
+    sim = UVSim(input_function=read, output_function=outputs.append)
+    sim.load(program)
+    try:
+        sim.run()
+        error = None
+    except Exception as e:
+        error = (type(e), str(e))
+    return outputs, list(sim.memory), sim.accumulator, sim.instruction_pointer, error
+
+def assert_matches(program, inputs):
+    results = run_batch(program, inputs)
+    for values, result in zip(inputs, results):
+        error = result["error"]
+        got = (result["outputs"], result["memory"], result["accumulator"],
+               result["instruction_pointer"], error and (type(error), str(error)))
+        assert got == run_single(program, values)
+    return results
+
+def test_batch_test1():
+    inputs = [[a, b] for a in range(-20, 20, 3) for b in (0, 7, 9999)]
+    results = assert_matches(load_file("Test1.txt"), inputs)
+    assert all(r["halted"] for r in results)
+
+def test_batch_divergent_branches():
+    # counts down from the input value; negative inputs exit immediately
+    program = ["+1020", "+2020", "+4107", "+4207", "+3121", "+2120", "+4001",
+               "+1120", "+4300"] + ["+0000"] * 11 + ["+0000", "+0001"]
+    assert_matches(program, [[n] for n in (-3, 0, 1, 5, 40)])
+
+def test_batch_errors_per_instance():
+    # divides by the second input and stores an out-of-range read for one instance
+    program = ["+1010", "+1011", "+2010", "+3211", "+2112", "+1112", "+4300"]
+    results = assert_matches(program, [[8, 2], [8, 0], [99999, 1], [5]])
+    assert results[0]["error"] is None
+    assert isinstance(results[1]["error"], ZeroDivisionError)
+    assert isinstance(results[2]["error"], ValueError)
+    assert isinstance(results[3]["error"], IndexError)
+
+def test_batch_max_steps():
+    results = run_batch(["+4000"], [[], []], max_steps=10)
+    assert all(not r["halted"] and r["error"] is None for r in results)
+    assert results[0]["steps"] == 10
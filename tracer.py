@@ -0,0 +1,153 @@
+import struct
+from collections import deque, namedtuple
+
+# One fixed-width record per executed step: instruction pointer, opcode,
+# operand, accumulator before and after, and the memory write (address, old
+# value, new value; address -1 when the step wrote nothing).
+RECORD = struct.Struct("<IBIiiiii")
+Step = namedtuple("Step", "step ip opcode operand acc_before acc_after address old new")
+
+
+class Trace:
+    # Records go into a preallocated ring buffer, so only the last `capacity`
+    # steps are kept. Every `snapshot_every` steps the full VM state is saved;
+    # jumping to a step restores the nearest usable snapshot (or the current
+    # state) and applies the deltas from there, without re-executing anything.
+    def __init__(self, capacity=100_000, snapshot_every=10_000):
+        if capacity < 1 or snapshot_every < 1:
+            raise ValueError("capacity and snapshot_every must be at least 1")
+        self.capacity = capacity
+        self.snapshot_every = snapshot_every
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.total = 0
+        self.position = 0
+        # Oldest step still held. It only moves forward: after a rewind
+        # lowers total, older ring slots may already hold newer, discarded steps.
+        self.oldest = 0
+        self.snapshots = deque()
+        self._ip_after = 0
+
+    @property
+    def first(self):
+        return max(self.oldest, self.total - self.capacity)
+
+    def __len__(self):
+        return self.total - self.first
+
+    def _prune(self):
+        # Keeps the newest snapshot at or before the oldest retained step.
+        first = self.first
+        while len(self.snapshots) > 1 and self.snapshots[1][0] <= first:
+            self.snapshots.popleft()
+
+    def _snapshot(self, sim):
+        if self.snapshots and self.snapshots[-1][0] == self.total:
+            return
+        self.snapshots.append((self.total, sim.memory[:], sim.accumulator, sim.instruction_pointer))
+
+    def _truncate(self, sim):
+        # Running again after rewinding discards the steps that were undone.
+        if self.position < self.total:
+            self.oldest = self.first
+            self.total = self.position
+            while self.snapshots and self.snapshots[-1][0] > self.total:
+                self.snapshots.pop()
+
+    def __getitem__(self, step):
+        if not (self.first <= step < self.total):
+            raise IndexError(f"Step {step} is not in the trace (holds {self.first}-{self.total - 1})")
+        fields = RECORD.unpack_from(self.buffer, (step % self.capacity) * RECORD.size)
+        return Step(step, *fields)
+
+    def replay(self, start=None, stop=None):
+        start = self.first if start is None else max(start, self.first)
+        stop = self.total if stop is None else min(stop, self.total)
+        for step in range(start, stop):
+            yield self[step]
+
+    def _ip_at(self, step):
+        # Instruction pointer after `step` steps.
+        return self[step].ip if step < self.total else self._ip_after
+
+    def _forward(self, sim, step):
+        mem = sim.memory
+        while self.position < step:
+            record = self[self.position]
+            sim.accumulator = record.acc_after
+            if record.address >= 0:
+                mem[record.address] = record.new
+            self.position += 1
+        sim.instruction_pointer = self._ip_at(self.position)
+
+    def _backward(self, sim, step):
+        mem = sim.memory
+        while self.position > step:
+            self.position -= 1
+            record = self[self.position]
+            sim.accumulator = record.acc_before
+            if record.address >= 0:
+                mem[record.address] = record.old
+            sim.instruction_pointer = record.ip
+
+    def jump(self, sim, step):
+        # Puts sim in the state it had after `step` steps had executed.
+        if not (self.first <= step <= self.total):
+            raise IndexError(f"Step {step} is not in the trace (holds {self.first}-{self.total})")
+        usable = [s for s in self.snapshots if self.first <= s[0] <= step]
+        distance = abs(self.position - step)
+        if usable and step - usable[-1][0] < distance:
+            at, memory, sim.accumulator, sim.instruction_pointer = usable[-1]
+            sim.memory[:] = memory
+            self.position = at
+        if step < self.position:
+            self._backward(sim, step)
+        else:
+            self._forward(sim, step)
+        sim.running = False
+
+    def step_back(self, sim, count=1):
+        self.jump(sim, max(self.first, self.position - count))
+
+    def step_forward(self, sim, count=1):
+        self.jump(sim, min(self.total, self.position + count))
+
+
+def run_traced(sim, max_steps=None):
+    trace = sim.trace
+    trace._truncate(sim)
+    mem = sim.memory
+    size = sim.MAX_MEM
+    base = sim._decode_base()
+    pack_into, buffer, width = RECORD.pack_into, trace.buffer, RECORD.size
+    capacity, every = trace.capacity, trace.snapshot_every
+    step = sim.step
+    executed = 0
+    sim.running = True
+    try:
+        while sim.running and (max_steps is None or executed < max_steps):
+            total = trace.total
+            if total % every == 0:
+                trace._snapshot(sim)
+                trace._prune()
+            ip = sim.instruction_pointer
+            acc = sim.accumulator
+            opcode, operand = divmod(abs(int(mem[ip])), base) if 0 <= ip < size else (0, 0)
+            if (opcode == 10 or opcode == 21) and operand < size:
+                old = mem[operand]
+                step()
+                pack_into(buffer, (total % capacity) * width, ip, opcode, operand, acc, sim.accumulator,
+                          operand, old, mem[operand])
+            else:
+                step()
+                pack_into(buffer, (total % capacity) * width, ip, opcode, operand, acc, sim.accumulator,
+                          -1, 0, 0)
+            trace.total = trace.position = total + 1
+            executed += 1
+    finally:
+        trace._ip_after = sim.instruction_pointer
+        trace._prune()
+        if max_steps is not None:
+            sim.steps += executed
+    if max_steps is not None:
+        return executed
+    return None
@@ -1,26 +1,56 @@
 import re
+import sys
+from array import array
+from engine import run_decoded
+from memory import make_memory, word_digits
 
 class UVSim:
-    def __init__(self, input_function=None, output_function=None):
-        self.MAX_MEM = 250
-        self.memory = [0] * self.MAX_MEM
+    __slots__ = (
+        "MAX_MEM", "memory", "accumulator", "instruction_pointer", "running",
+        "input_function", "output_function", "format", "engine", "steps",
+        "verified", "reachable", "mutable", "profile", "trace",
+        "debugger", "memory_kind", "decoded",
+    )
+
+    def __init__(self, input_function=None, output_function=None, engine="interp",
+                 memory_size=250, memory_kind=None):
+        self.MAX_MEM = memory_size
+        self.memory_kind = memory_kind
+        self.memory = make_memory(memory_size, memory_kind)
         self.accumulator = 0
         self.instruction_pointer = 0
         self.running = False
         self.input_function = input_function or self._default_input
         self.output_function = output_function or self._default_output
         self.format = None
+        self.engine = engine
+        self.steps = 0
+        self.verified = False
+        self.reachable = frozenset()
+        self.mutable = frozenset()
+        self.profile = None
+        self.trace = None
+        self.debugger = None
+        self.decoded = None
 
     def _max_word(self):
-        return 9999 if self.format == 4 else 999999
+        return 9999 if self.format == 4 else 10 ** (self.format or 6) - 1
+
+    def _decode_base(self):
+        # Words are opcode * base + operand: two operand digits in 4-digit
+        # programs, and everything after the 3-digit opcode field otherwise.
+        return 100 if self.format == 4 else 10 ** ((self.format or 6) - 3)
+
+    def _operand_error(self, operand):
+        if self.format == 4:
+            return IndexError(f"Invalid operand address {operand} for 4-digit program.")
+        return IndexError(f"Invalid operand address {operand} for {self.format or 6}-digit program "
+                          f"(must be 000-{self.MAX_MEM - 1:03d}).")
 
     def _truncate_to_word(self, value):
         sign = -1 if value < 0 else 1
         mag = abs(int(value))
-        if self.format == 4:
-            low = mag % 10000
-        else:
-            low = mag % 1000000
+        low = mag % (self._max_word() + 1)
         return sign * low
 
     def set_memory(self, address, value):
@@ -29,6 +59,9 @@ class UVSim:
         limit = self._max_word()
         if not (-limit <= value <= limit):
             raise ValueError(f"Value out of range (-{limit} - {limit})")
+        if address in self.reachable:
+            # The unchecked loop trusts that verified code never changes.
+            self.verified = False
         self.memory[address] = int(value)
 
     def get_memory(self, address):
@@ -50,10 +83,22 @@ class UVSim:
     def _default_output(self, value):
         print(value)
 
+    def snapshot(self):
+        return (self.memory[:], self.accumulator, self.instruction_pointer, self.format, self.steps,
+                self.verified, self.reachable, self.mutable)
+
+    def restore(self, snapshot):
+        (memory, self.accumulator, self.instruction_pointer, self.format, self.steps,
+         self.verified, self.reachable, self.mutable) = snapshot
+        self.memory[:] = memory
+        self.running = False
+
     def load(self, lines):
-        self.memory = [0] * self.MAX_MEM
+        self.memory = make_memory(self.MAX_MEM, self.memory_kind)
         self.accumulator = 0
         self.instruction_pointer = 0
+        self.steps = 0
+        wide = word_digits(self.MAX_MEM)
         fmt = None
         for i, raw in enumerate(lines):
             if i >= self.MAX_MEM:
@@ -63,17 +108,14 @@ class UVSim:
                 if s == "":
                     value = 0
                 else:
-                    if re.fullmatch(r'[+-]?\d{6}', s):
-                        f = 6
-                    elif re.fullmatch(r'[+-]?\d{1,4}', s):
-                        f = 4
-                    else:
+                    word = parse_word(s, wide)
+                    if word is None:
                         raise ValueError(f"Malformed word at input line {i+1}: '{s}'")
+                    value, f = word
                     if fmt is None:
                         fmt = f
                     elif fmt != f:
-                        raise ValueError("Mixed 4-digit and 6-digit words in same file.")
-                    value = int(s)
+                        raise ValueError(f"Mixed {min(fmt, f)}-digit and {max(fmt, f)}-digit words in same file.")
             elif isinstance(raw, int):
                 value = raw
             else:
@@ -82,35 +124,182 @@ class UVSim:
             if fmt is not None:
                 self.format = fmt
 
-            if self.format == 4:
-                if not (-9999 <= value <= 9999):
-                    raise ValueError(f"Value out of 4-digit range at line {i+1}: {value}")
-            elif self.format == 6:
-                if not (-999999 <= value <= 999999):
-                    raise ValueError(f"Value out of 6-digit range at line {i+1}: {value}")
+            if self.format is not None:
+                limit = self._max_word()
+                if not (-limit <= value <= limit):
+                    raise ValueError(f"Value out of {self.format}-digit range at line {i+1}: {value}")
 
             self.set_memory(i, value)
 
         if self.format is None:
             self.format = 6
+        self._verify()
+
+    def load_words(self, words, fmt):
+        # Loads an already encoded image (an array("i") of words, e.g. from
+        # binary.py) without parsing: only the length and value range are checked.
+        if fmt not in (4, 6, word_digits(self.MAX_MEM)):
+            raise ValueError(f"Unsupported word format: {fmt}")
+        if len(words) > self.MAX_MEM:
+            raise IndexError(f"Input too large. Max {self.MAX_MEM} lines allowed.")
+        limit = 9999 if fmt == 4 else 10 ** fmt - 1
+        if len(words) and (max(words) > limit or min(words) < -limit):
+            i = next(i for i, value in enumerate(words) if not (-limit <= value <= limit))
+            raise ValueError(f"Value out of {fmt}-digit range at line {i+1}: {words[i]}")
+        self.memory = make_memory(self.MAX_MEM, self.memory_kind)
+        self.memory[:len(words)] = words
+        self.accumulator = 0
+        self.instruction_pointer = 0
+        self.steps = 0
+        self.format = fmt
+        self._verify()
+
+    def _verify(self):
+        # Walk every word reachable from address 0. The program is verified when
+        # each of them decodes to a valid instruction, control never runs off the
+        # end of memory and no STORE/READ can overwrite one of them, so the words
+        # the fast loop fetches are exactly the ones checked here.
+        base = self._decode_base()
+        reachable = set()
+        mutable = set()
+        verified = True
+        pending = [0]
+        while pending:
+            address = pending.pop()
+            if address in reachable:
+                continue
+            if not (0 <= address < self.MAX_MEM):
+                verified = False
+                continue
+            reachable.add(address)
+            opcode, operand = divmod(abs(self.memory[address]), base)
+            if operand >= self.MAX_MEM or opcode not in (10, 11, 20, 21, 30, 31, 32, 33, 40, 41, 42, 43):
+                verified = False
+                continue
+            if opcode in (10, 21):
+                mutable.add(operand)
+            if opcode == 40:
+                pending.append(operand)
+            elif opcode in (41, 42):
+                pending.extend((operand, address + 1))
+            elif opcode != 43:
+                pending.append(address + 1)
+        self.reachable = frozenset(reachable)
+        self.mutable = frozenset(mutable)
+        self.verified = verified and not (self.mutable & self.reachable)
 
-    def run(self):
+    def run(self, max_steps=None):
+        if self.debugger is not None and self.debugger.armed:
+            from debugger import run_debug
+            return run_debug(self, max_steps)
+        if self.trace is not None:
+            from tracer import run_traced
+            return run_traced(self, max_steps)
+        if self.profile is not None:
+            from profiler import run_profiled
+            return run_profiled(self, max_steps)
+        # The decoded and compiled engines pre-decode the whole address space,
+        # so sparse memories always run on the interpreter.
+        dense = isinstance(self.memory, array)
+        if self.engine == "decoded" and dense:
+            return run_decoded(self, max_steps)
+        if self.engine == "compiled" and dense:
+            from compiler import run_compiled
+            return run_compiled(self, max_steps)
+        if self.verified and self.instruction_pointer in self.reachable:
+            return self._run_unchecked(max_steps)
         self.running = True
-        while self.running:
-            instruction = self.get_memory(self.instruction_pointer)
-            instr_abs = abs(int(instruction))
-            if self.format == 4:
-                opcode = instr_abs // 100
-                operand = instr_abs % 100
-                if not (0 <= operand <= 99):
-                    raise IndexError(f"Invalid operand address {operand} for 4-digit program.")
-            else:
-                opcode = instr_abs // 1000
-                operand = instr_abs % 1000
-                if not (0 <= operand <= 249):
-                    raise IndexError(f"Invalid operand address {operand} for 6-digit program (must be 000-249).")
+        if max_steps is None:
+            while self.running:
+                self.step()
+            return None
+        executed = 0
+        try:
+            while self.running and executed < max_steps:
+                self.step()
+                executed += 1
+        finally:
+            self.steps += executed
+        return executed
 
-            self._execute(opcode, operand)
+    def _run_unchecked(self, max_steps=None):
+        mem = self.memory
+        base = self._decode_base()
+        limit = self._max_word()
+        modulus = limit + 1
+        acc = self.accumulator
+        ip = self.instruction_pointer
+        # An int stands in for "no budget" so the counter stays on Python's
+        # fast integer path.
+        remaining = sys.maxsize if max_steps is None else max_steps
+        self.running = True
+        try:
+            while self.running and remaining > 0:
+                remaining -= 1
+                opcode, operand = divmod(abs(mem[ip]), base)
+                if opcode == 20:
+                    acc = mem[operand]
+                    ip += 1
+                elif opcode == 21:
+                    if not (-limit <= acc <= limit):
+                        raise ValueError(f"Value out of range (-{limit} - {limit})")
+                    mem[operand] = acc
+                    ip += 1
+                elif opcode == 30:
+                    res = acc + mem[operand]
+                    acc = res % modulus if res >= 0 else -(-res % modulus)
+                    ip += 1
+                elif opcode == 31:
+                    res = acc - mem[operand]
+                    acc = res % modulus if res >= 0 else -(-res % modulus)
+                    ip += 1
+                elif opcode == 40:
+                    ip = operand
+                elif opcode == 41:
+                    ip = operand if acc < 0 else ip + 1
+                elif opcode == 42:
+                    ip = operand if acc == 0 else ip + 1
+                elif opcode == 33:
+                    res = acc * mem[operand]
+                    acc = res % modulus if res >= 0 else -(-res % modulus)
+                    ip += 1
+                elif opcode == 32:
+                    denom = mem[operand]
+                    if denom == 0:
+                        raise ZeroDivisionError("Division by zero.")
+                    res = acc // denom
+                    acc = res % modulus if res >= 0 else -(-res % modulus)
+                    ip += 1
+                elif opcode == 10 or opcode == 11:
+                    self.accumulator = acc
+                    self.instruction_pointer = ip
+                    self._execute(opcode, operand)
+                    acc = self.accumulator
+                    ip = self.instruction_pointer
+                elif opcode == 43:
+                    self.running = False
+                else:
+                    raise RuntimeError(f"Invalid opcode: {opcode}")
+        except Exception:
+            remaining += 1
+            raise
+        finally:
+            self.accumulator = acc
+            self.instruction_pointer = ip
+            if max_steps is not None:
+                self.steps += max_steps - remaining
+        if max_steps is not None:
+            return max_steps - remaining
+        return None
+
+    def step(self):
+        instruction = self.get_memory(self.instruction_pointer)
+        instr_abs = abs(int(instruction))
+        opcode, operand = divmod(instr_abs, self._decode_base())
+        if self.format != 4 and operand >= self.MAX_MEM:
+            raise self._operand_error(operand)
+
+        self._execute(opcode, operand)
 
     def _execute(self, opcode, operand):
         if opcode == 10:
@@ -169,25 +358,52 @@ class UVSim:
         else:
             raise RuntimeError(f"Invalid opcode: {opcode}")
 
+_WORD = re.compile(r'[+-]?\d+')
+
+
+def parse_word(s, wide=6):
+    # (value, format) for one stripped word of program text, or None when it
+    # is malformed. wide is the widest format the machine accepts.
+    digits = len(s.lstrip("+-"))
+    if not _WORD.fullmatch(s) or not (digits <= 4 or digits == 6 or digits == wide):
+        return None
+    return int(s), 4 if digits <= 4 else digits
+
+
+_WORDS_4_TO_6 = None
+
+
+def _conversion_table():
+    # Every canonical 4-digit token ("dddd", "+dddd", "-dddd") mapped to its
+    # 6-digit form; built on first use so importing uvsim stays cheap.
+    global _WORDS_4_TO_6
+    if _WORDS_4_TO_6 is None:
+        table = {}
+        for value in range(10000):
+            first_two = value // 100
+            word = f"0{first_two}0{value % 100:02d}" if 10 <= first_two <= 43 else f"{value:06d}"
+            core = f"{value:04d}"
+            table[core] = table["+" + core] = word
+            table["-" + core] = "-" + word
+        _WORDS_4_TO_6 = table
+    return _WORDS_4_TO_6
+
+
+def convert_word_4_to_6(raw, table=None):
+    table = table or _conversion_table()
+    s = str(raw).strip()
+    word = table.get(s)
+    if word is not None:
+        return word
+    if s == "":
+        return "000000"
+    sign = "-" if s.startswith("-") else ""
+    core = s.lstrip("+-")
+    if not core.isdigit() or not (1 <= len(core) <= 4):
+        raise ValueError(f"Not a valid 4-digit token: '{s}'")
+    return table[sign + core.zfill(4)]
+
+
 def convert_4_to_6(lines):
-    valid_opcodes = set(range(10, 44))
-    out = []
-    for raw in lines:
-        s = str(raw).strip()
-        if s == "":
-            out.append("000000")
-            continue
-        sign = "-" if s.startswith("-") else ""
-        core = s.lstrip("+-")
-        if not core.isdigit() or not (1 <= len(core) <= 4):
-            raise ValueError(f"Not a valid 4-digit token: '{s}'")
-        core4 = core.zfill(4)
-        first_two = int(core4[:2])
-        if first_two in valid_opcodes:
-            opcode = f"{first_two:03d}"
-            operand = int(core4[2:])
-            out.append(f"{sign}{opcode}{operand:03d}")
-        else:
-            num = int(core)
-            out.append(f"{sign}{num:06d}")
-    return out
+    table = _conversion_table()
+    return [convert_word_4_to_6(raw, table) for raw in lines]
@@ -0,0 +1,138 @@
+from uvsim import UVSim
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def run_batch(program, inputs, max_steps=None):
+    if np is None:
+        raise ImportError("run_batch requires numpy (pip install numpy).")
+
+    sim = UVSim()
+    sim.load(program)
+    n = len(inputs)
+    size = sim.MAX_MEM
+    fmt4 = sim.format == 4
+    base = sim._decode_base()
+    limit = sim._max_word()
+    modulus = limit + 1
+
+    mem = np.tile(np.array(sim.memory, dtype=np.int64), (n, 1))
+    acc = np.zeros(n, dtype=np.int64)
+    ip = np.zeros(n, dtype=np.int64)
+    steps = np.zeros(n, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+    halted = np.zeros(n, dtype=bool)
+    errors = [None] * n
+    outputs = [[] for _ in range(n)]
+
+    width = max((len(values) for values in inputs), default=0)
+    feed = np.zeros((n, width), dtype=np.int64)
+    lengths = np.zeros(n, dtype=np.int64)
+    for row, values in enumerate(inputs):
+        feed[row, :len(values)] = [int(v) for v in values]
+        lengths[row] = len(values)
+    cursor = np.zeros(n, dtype=np.int64)
+
+    def fail(rows, exc_type, message):
+        for row in rows:
+            errors[row] = exc_type(message(row) if callable(message) else message)
+        active[rows] = False
+
+    def truncate(values):
+        return np.sign(values) * (np.abs(values) % modulus)
+
+    taken = 0
+    while active.any() and (max_steps is None or taken < max_steps):
+        taken += 1
+        rows = np.nonzero(active)[0]
+        cur = ip[rows]
+
+        off = cur >= size
+        if off.any():
+            fail(rows[off], IndexError, lambda r: f"Invalid memory address: {ip[r]}")
+            rows, cur = rows[~off], cur[~off]
+
+        word = np.abs(mem[rows, cur])
+        opcode, operand = word // base, word % base
+        if not fmt4:
+            bad = operand >= size
+            if bad.any():
+                bad_operand = dict(zip(rows[bad].tolist(), operand[bad].tolist()))
+                fail(rows[bad], IndexError, lambda r: str(sim._operand_error(bad_operand[r])))
+                rows, opcode, operand = rows[~bad], opcode[~bad], operand[~bad]
+        steps[rows] += 1
+
+        for op in np.unique(opcode).tolist():
+            sel = opcode == op
+            r, a = rows[sel], operand[sel]
+            if op == 10:
+                empty = cursor[r] >= lengths[r]
+                if empty.any():
+                    fail(r[empty], IndexError, "No input remaining.")
+                    r, a = r[~empty], a[~empty]
+                values = feed[r, cursor[r]]
+                cursor[r] += 1
+                wide = (values < -limit) | (values > limit)
+                if wide.any():
+                    fail(r[wide], ValueError, f"Value out of range (-{limit} - {limit})")
+                    r, a, values = r[~wide], a[~wide], values[~wide]
+                mem[r, a] = values
+                ip[r] += 1
+            elif op == 11:
+                for row, value in zip(r.tolist(), mem[r, a].tolist()):
+                    outputs[row].append(value)
+                ip[r] += 1
+            elif op == 20:
+                acc[r] = mem[r, a]
+                ip[r] += 1
+            elif op == 21:
+                wide = (acc[r] < -limit) | (acc[r] > limit)
+                if wide.any():
+                    fail(r[wide], ValueError, f"Value out of range (-{limit} - {limit})")
+                    r, a = r[~wide], a[~wide]
+                mem[r, a] = acc[r]
+                ip[r] += 1
+            elif op == 30:
+                acc[r] = truncate(acc[r] + mem[r, a])
+                ip[r] += 1
+            elif op == 31:
+                acc[r] = truncate(acc[r] - mem[r, a])
+                ip[r] += 1
+            elif op == 32:
+                denom = mem[r, a]
+                zero = denom == 0
+                if zero.any():
+                    fail(r[zero], ZeroDivisionError, "Division by zero.")
+                    r, denom = r[~zero], denom[~zero]
+                acc[r] = truncate(acc[r] // denom)
+                ip[r] += 1
+            elif op == 33:
+                acc[r] = truncate(acc[r] * mem[r, a])
+                ip[r] += 1
+            elif op == 40:
+                ip[r] = a
+            elif op == 41:
+                ip[r] = np.where(acc[r] < 0, a, ip[r] + 1)
+            elif op == 42:
+                ip[r] = np.where(acc[r] == 0, a, ip[r] + 1)
+            elif op == 43:
+                active[r] = False
+                halted[r] = True
+            else:
+                fail(r, RuntimeError, f"Invalid opcode: {op}")
+
+    return [
+        {
+            "outputs": outputs[row],
+            "memory": mem[row].tolist(),
+            "accumulator": int(acc[row]),
+            "instruction_pointer": int(ip[row]),
+            "error": errors[row],
+            "halted": bool(halted[row]),
+            "steps": int(steps[row]),
+        }
+        for row in range(n)
+    ]